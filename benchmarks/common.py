@@ -0,0 +1,159 @@
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import time
+from benchmarks.histogram import Histogram
+from tests import client
+from tests.server import JAR_PATH, ROOT_DIR, TodoManagerServer, free_port
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+PERCENTILES = (50, 90, 99, 99.9)
+FORMATS = {"json": "application/json", "xml": "application/xml"}
+# Upper bound on the fitted exponent for each label, the last one catches everything above
+GROWTH_CLASSES = ((0.25, "O(1)"), (0.75, "sublinear"), (1.25, "O(n)"), (float("inf"), "superlinear"))
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--url", help="benchmark an already running server instead of launching the jar")
+    parser.add_argument("--jar", default=JAR_PATH)
+    parser.add_argument("--output", help="results file, defaults to benchmarks/results/<name>-<jar>.json")
+
+
+def add_run_arguments(parser, iterations=2000, warmup=200, repeats=3):
+    parser.add_argument("--iterations", type=int, default=iterations)
+    parser.add_argument("--warmup", type=int, default=warmup)
+    parser.add_argument("--repeats", type=int, default=repeats)
+
+
+@contextlib.contextmanager
+def server_for(args):
+    # A freshly launched jar per benchmark run keeps results independent of earlier runs
+    if args.url:
+        yield args.url.rstrip("/"), None
+        return
+    server = TodoManagerServer(free_port(), jar=args.jar).start()
+    try:
+        yield server.base_url, server
+    finally:
+        server.stop()
+
+
+def headers_for(fmt, body=False):
+    headers = {'Accept': FORMATS[fmt]}
+    if body:
+        headers['Content-Type'] = FORMATS[fmt]
+    return headers
+
+
+def encode_body(fmt, root, fields):
+    if fields is None:
+        return None
+    if fmt == "json":
+        return json.dumps(fields)
+    return "<%s>%s</%s>" % (root, "".join("<%s>%s</%s>" % (k, str(v).lower() if isinstance(v, bool) else v, k)
+                                          for k, v in fields.items()), root)
+
+
+def summarize(histogram, elapsed):
+    # Every benchmark reports latency this way, the serialized histogram lets runs be merged later
+    return {
+        "requests": histogram.count,
+        "seconds": elapsed,
+        "rps": histogram.count / elapsed if elapsed else 0.0,
+        "latency_ms": {"p%g" % pct: histogram.percentile(pct) * 1000 for pct in PERCENTILES},
+        "max_ms": histogram.max * 1000,
+        "histogram": histogram.to_json(),
+    }
+
+
+def fit_slope(xs, ys):
+    # Least squares slope of ys against xs
+    points = list(zip(xs, ys))
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def fit_growth(sizes, values):
+    # The k in value ~ size^k, fixed per-request overhead pulls it down at small sizes
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if size > 0 and value > 0]
+    return fit_slope([x for x, _ in points], [y for _, y in points])
+
+
+def growth_class(exponent):
+    for limit, label in GROWTH_CLASSES:
+        if exponent < limit:
+            return label
+    return GROWTH_CLASSES[-1][1]
+
+
+def growth_rank(label):
+    return [label for _, label in GROWTH_CLASSES].index(label)
+
+
+def growth_fits(results, size_key):
+    # One fit of p50 latency against results[size_key] per route and format
+    series = {}
+    for result in results:
+        series.setdefault((result["route"], result["format"]), []).append((result[size_key], result["latency_ms"]["p50"]))
+    fits = []
+    for (route, fmt), points in series.items():
+        points.sort()
+        sizes, latencies = [size for size, _ in points], [p50 for _, p50 in points]
+        exponent = fit_growth(sizes, latencies)
+        fits.append({
+            "case": route,
+            "format": fmt,
+            "exponent": exponent,
+            "us_per_item": fit_slope(sizes, latencies) * 1000,
+            "growth": growth_class(exponent),
+        })
+    return fits
+
+
+def timed_requests(session, requests_to_send):
+    # Closed loop: one request in flight, latency measured around the full round trip
+    samples = Histogram()
+    statuses = {}
+    started = time.perf_counter()
+    for method, url, headers, body in requests_to_send:
+        sent = time.perf_counter()
+        response = session.request(method, url, headers=headers, data=body)
+        response.content
+        samples.record(time.perf_counter() - sent)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return samples, time.perf_counter() - started, statuses
+
+
+def new_session():
+    return client.new_session(pool_connections=1, pool_maxsize=1)
+
+
+def run_metadata(args, base_url):
+    return {
+        "jar": os.path.basename(args.jar) if not args.url else None,
+        "url": base_url,
+        "started": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(name, args, data):
+    path = args.output
+    if not path:
+        jar = os.path.splitext(os.path.basename(args.jar))[0] if not args.url else "external"
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, "%s-%s.json" % (name, jar))
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    return path
@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+
+# Usage: python -m benchmarks.compare baseline.json candidate.json
+
+
+def load(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data, {(result["case"], result["format"]): result for result in data["results"]}
+
+
+def change(before, after):
+    if not before:
+        return float("inf") if after else 0.0
+    return (after - before) / before * 100
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="flag changes larger than this percentage")
+    args = parser.parse_args(argv)
+
+    baseline_meta, baseline = load(args.baseline)
+    candidate_meta, candidate = load(args.candidate)
+    print("%s (%s) -> %s (%s)" % (args.baseline, baseline_meta.get("jar"), args.candidate, candidate_meta.get("jar")))
+    regressions = 0
+    for key in sorted(set(baseline) | set(candidate)):
+        if key not in baseline or key not in candidate:
+            print("%-36s %-4s only in %s" % (key[0], key[1], "baseline" if key in baseline else "candidate"))
+            continue
+        before, after = baseline[key], candidate[key]
+        rps = change(before["rps"], after["rps"])
+        p99 = change(before["latency_ms"]["p99"], after["latency_ms"]["p99"])
+        flag = ""
+        if rps < -args.threshold or p99 > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print("%-36s %-4s req/s %+7.1f%%  p99 %+7.1f%%%s" % (key[0], key[1], rps, p99, flag))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
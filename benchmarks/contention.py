@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from benchmarks import common
+from benchmarks.histogram import Histogram
+from tests.async_client import AsyncTodoManagerClient
+
+# Usage: python -m benchmarks.contention [--levels 1 2 4 8 16 32 64 128] [--requests 2000] [--invalid 0.5]
+#
+# Fires bursts of concurrent POST /todos and POST /projects, valid and invalid mixed, at rising
+# concurrency. Every create the server validates takes the next id of its collection, failed ones
+# included, so after each burst the counters must have moved on by exactly one per request with no id
+# handed out twice. Any violation exits 1.
+#
+# Throughput per level is fitted to the Universal Scalability Law, X(N) = X(1) N / (1 + s(N-1) + k N(N-1)):
+# s is the share serialised on contention (locks around the id counters and collections), k the
+# coherency cost that makes throughput fall past the peak at sqrt((1 - s) / k). The knee is the lowest
+# level reaching --knee of the best throughput, beyond it more concurrency only adds queueing. A burst
+# where this process used most of a core measured the client rather than the jar, those are flagged.
+
+REQUESTS = {
+    "todos": {"valid": {"title": "contention todo"}, "invalid": ({}, {"title": "contention todo", "unknown": "x"})},
+    "projects": {"valid": {"title": "contention project"}, "invalid": ({"title": "contention project", "completed": "x"},)},
+}
+CLIENT_BOUND = 0.9
+
+
+def plan_burst(rng, count, invalid_ratio):
+    plan = []
+    for collection in rng.choices(list(REQUESTS), k=count):
+        if rng.random() < invalid_ratio:
+            plan.append((collection, False, rng.choice(REQUESTS[collection]["invalid"])))
+        else:
+            plan.append((collection, True, REQUESTS[collection]["valid"]))
+    return plan
+
+
+async def next_ids(api):
+    ids = {}
+    for collection in REQUESTS:
+        response = await api.post("/" + collection, json=REQUESTS[collection]["valid"])
+        ids[collection] = int(response.json()["id"])
+    return ids
+
+
+async def run_burst(api, plan, concurrency):
+    # Closed loop: `concurrency` workers, each sends its next request as soon as the last one answers
+    responses = [None] * len(plan)
+    latency = Histogram()
+    pending = iter(range(len(plan)))
+
+    async def worker():
+        for index in pending:
+            collection, _, body = plan[index]
+            sent = time.perf_counter()
+            responses[index] = await api.post("/" + collection, json=body)
+            latency.record(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return responses, latency, time.perf_counter() - started
+
+
+def check_ids(plan, responses, before, after):
+    violations = []
+    for collection in REQUESTS:
+        sent = [(valid, response) for (planned, valid, _), response in zip(plan, responses) if planned == collection]
+        for valid, response in sent:
+            if response.status_code != (201 if valid else 400):
+                violations.append("%s: %s create answered %d: %s" % (collection, "valid" if valid else "invalid",
+                                                                      response.status_code, response.content[:100]))
+        ids = [int(response.json()["id"]) for _, response in sent if response.status_code == 201]
+        if len(ids) != len(set(ids)):
+            violations.append("%s: %d ids handed out more than once" % (collection, len(ids) - len(set(ids))))
+        outside = [new_id for new_id in ids if not before[collection] < new_id <= before[collection] + len(sent)]
+        if outside:
+            violations.append("%s: ids %s outside (%d, %d]" % (collection, sorted(outside)[:5], before[collection],
+                                                                 before[collection] + len(sent)))
+        if after[collection] != before[collection] + len(sent) + 1:
+            violations.append("%s: counter moved by %d for %d requests" % (collection, after[collection] - before[collection] - 1,
+                                                                            len(sent)))
+    return violations
+
+
+async def run_level(base_url, concurrency, args):
+    rng = random.Random(args.seed + concurrency)
+    plan = plan_burst(rng, args.requests, args.invalid)
+    async with AsyncTodoManagerClient(base_url, connections=concurrency) as api:
+        # Warm-up, also opens the connections
+        await run_burst(api, plan_burst(rng, max(concurrency, args.requests // 10), args.invalid), concurrency)
+        before = await next_ids(api)
+        cpu = time.process_time()
+        responses, latency, elapsed = await run_burst(api, plan, concurrency)
+        cpu = time.process_time() - cpu
+        after = await next_ids(api)
+    statuses = {}
+    for response in responses:
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    return dict(common.summarize(latency, elapsed), concurrency=concurrency, statuses=statuses,
+                client_cpu=cpu / elapsed if elapsed else 0.0, violations=check_ids(plan, responses, before, after))
+
+
+def fit_usl(results):
+    # Linearised: N / C(N) - 1 = s (N - 1) + k N (N - 1), with C(N) = X(N) / X(1), solved by least squares
+    base = next((result["rps"] for result in results if result["concurrency"] == 1), None)
+    points = [(result["concurrency"], result["rps"] / base) for result in results if base and result["concurrency"] > 1]
+    if len(points) < 2:
+        return None
+    xs = [(n - 1, n * (n - 1), n / relative - 1) for n, relative in points]
+    a = sum(x1 * x1 for x1, _, _ in xs)
+    b = sum(x1 * x2 for x1, x2, _ in xs)
+    c = sum(x2 * x2 for _, x2, _ in xs)
+    d = sum(x1 * y for x1, _, y in xs)
+    e = sum(x2 * y for _, x2, y in xs)
+    determinant = a * c - b * b
+    if not determinant:
+        return None
+    sigma, kappa = (d * c - b * e) / determinant, (a * e - b * d) / determinant
+    peak = ((1 - sigma) / kappa) ** 0.5 if kappa > 0 and sigma < 1 else None
+    peak_rps = base * peak / (1 + sigma * (peak - 1) + kappa * peak * (peak - 1)) if peak else None
+    return {"sigma": sigma, "kappa": kappa, "peak_concurrency": peak, "peak_rps": peak_rps}
+
+
+def find_knee(results, share):
+    best = max(result["rps"] for result in results)
+    return min(result["concurrency"] for result in results if result["rps"] >= share * best)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Id allocation and throughput of concurrent creates as concurrency rises")
+    common.add_server_arguments(parser)
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32, 64, 128])
+    # Requests per level, and the share of them that fail validation
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--invalid", type=float, default=0.5)
+    parser.add_argument("--knee", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.levels.sort()
+
+    with common.server_for(args) as (base_url, server):
+        data = dict(common.run_metadata(args, base_url), benchmark="contention", results=[])
+        # One throwaway burst at the top level first, or the ramp would also measure the JIT warming up
+        asyncio.run(run_level(base_url, args.levels[-1], args))
+        for concurrency in args.levels:
+            result = asyncio.run(run_level(base_url, concurrency, args))
+            result["client_bound"] = result["client_cpu"] >= CLIENT_BOUND
+            data["results"].append(result)
+            print("concurrency %4d  %8.0f req/s  p50 %8.2fms  p99 %8.2fms  client cpu %3.0f%%  %s%s%s" % (
+                concurrency, result["rps"], result["latency_ms"]["p50"], result["latency_ms"]["p99"],
+                result["client_cpu"] * 100, result["statuses"], "  CLIENT BOUND" if result["client_bound"] else "",
+                "".join("\n  ID VIOLATION " + violation for violation in result["violations"])))
+    data["usl"] = fit_usl(data["results"])
+    data["knee"] = find_knee(data["results"], args.knee)
+    if data["usl"] is not None:
+        usl = data["usl"]
+        print("usl: contention %.4f, coherency %.6f, predicted peak %s" % (
+            usl["sigma"], usl["kappa"], "%.0f req/s at concurrency %.1f" % (usl["peak_rps"], usl["peak_concurrency"])
+            if usl["peak_concurrency"] else "none (no retrograde region)"))
+    print("knee: concurrency %d reaches %.0f%% of the best throughput" % (data["knee"], args.knee * 100))
+    print("results written to " + common.write_results("contention", args, data))
+    return 1 if any(result["violations"] for result in data["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import argparse
+import sys
+from benchmarks import common
+from benchmarks.histogram import Histogram
+
+# Usage: python -m benchmarks.endpoints [--iterations N] [--formats json xml] [--cases GET /todos ...]
+
+ENTITIES = {
+    "todos": ("todo", {"title": "bench todo", "doneStatus": False, "description": "benchmark"}),
+    "projects": ("project", {"title": "bench project", "completed": False, "active": False, "description": "benchmark"}),
+    "categories": ("category", {"title": "bench category", "description": "benchmark"}),
+}
+
+# (parent collection, relationship, child collection) as exercised by the test packages
+RELATIONSHIPS = [
+    ("todos", "categories", "categories"),
+    ("todos", "tasksof", "projects"),
+    ("projects", "categories", "categories"),
+    ("projects", "tasks", "todos"),
+]
+
+SEEDED_ID = "1"
+
+
+class Context:
+
+    def __init__(self, session, base_url):
+        self.session = session
+        self.base_url = base_url
+
+    def create(self, collection):
+        response = self.session.post(self.base_url + "/" + collection, json=ENTITIES[collection][1],
+                                     headers=common.headers_for("json"))
+        return response.json()["id"]
+
+    def link(self, parent, parent_id, relationship, child_id):
+        self.session.post(self.base_url + "/%s/%s/%s" % (parent, parent_id, relationship), json={"id": child_id},
+                          headers=common.headers_for("json"))
+
+
+class Case:
+
+    def __init__(self, method, route, build):
+        self.method = method
+        self.route = route
+        self.build = build
+
+    @property
+    def name(self):
+        return self.method + " " + self.route
+
+
+def fixed(method, path):
+    def build(ctx, fmt, count):
+        return [(method, ctx.base_url + path, common.headers_for(fmt), None)] * count
+    return build
+
+
+def create_entity(collection):
+    def build(ctx, fmt, count):
+        root, fields = ENTITIES[collection]
+        body = common.encode_body(fmt, root, fields)
+        return [("POST", ctx.base_url + "/" + collection, common.headers_for(fmt, body=True), body)] * count
+    return build
+
+
+def amend_entity(method, collection):
+    def build(ctx, fmt, count):
+        root, fields = ENTITIES[collection]
+        target = ctx.create(collection)
+        body = common.encode_body(fmt, root, dict(fields, title="amended"))
+        return [(method, ctx.base_url + "/%s/%s" % (collection, target), common.headers_for(fmt, body=True), body)] * count
+    return build
+
+
+def delete_entity(collection):
+    def build(ctx, fmt, count):
+        targets = [ctx.create(collection) for _ in range(count)]
+        return [("DELETE", ctx.base_url + "/%s/%s" % (collection, target), common.headers_for(fmt), None) for target in targets]
+    return build
+
+
+def link_relationship(parent, relationship, child):
+    def build(ctx, fmt, count):
+        parent_id = ctx.create(parent)
+        children = [ctx.create(child) for _ in range(count)]
+        url = ctx.base_url + "/%s/%s/%s" % (parent, parent_id, relationship)
+        # XML link bodies always answer 404 (see test_post_todos_id_tasksof_xml), so only Accept varies
+        headers = dict(common.headers_for(fmt), **{'Content-Type': 'application/json'})
+        return [("POST", url, headers, common.encode_body("json", None, {"id": child_id})) for child_id in children]
+    return build
+
+
+def unlink_relationship(parent, relationship, child):
+    def build(ctx, fmt, count):
+        parent_id = ctx.create(parent)
+        children = [ctx.create(child) for _ in range(count)]
+        for child_id in children:
+            ctx.link(parent, parent_id, relationship, child_id)
+        return [("DELETE", ctx.base_url + "/%s/%s/%s/%s" % (parent, parent_id, relationship, child_id), common.headers_for(fmt), None)
+                for child_id in children]
+    return build
+
+
+def all_cases():
+    # Reads run first so they always see the seeded dataset
+    cases = []
+    for collection in ("todos", "projects"):
+        for method in ("GET", "HEAD"):
+            cases.append(Case(method, "/" + collection, fixed(method, "/" + collection)))
+            cases.append(Case(method, "/%s/:id" % collection, fixed(method, "/%s/%s" % (collection, SEEDED_ID))))
+    for parent, relationship, child in RELATIONSHIPS:
+        for method in ("GET", "HEAD"):
+            cases.append(Case(method, "/%s/:id/%s" % (parent, relationship), fixed(method, "/%s/%s/%s" % (parent, SEEDED_ID, relationship))))
+    for collection in ("todos", "projects"):
+        cases.append(Case("POST", "/" + collection, create_entity(collection)))
+        cases.append(Case("POST", "/%s/:id" % collection, amend_entity("POST", collection)))
+        cases.append(Case("PUT", "/%s/:id" % collection, amend_entity("PUT", collection)))
+        cases.append(Case("DELETE", "/%s/:id" % collection, delete_entity(collection)))
+    for parent, relationship, child in RELATIONSHIPS:
+        cases.append(Case("POST", "/%s/:id/%s" % (parent, relationship), link_relationship(parent, relationship, child)))
+        cases.append(Case("DELETE", "/%s/:id/%s/:id" % (parent, relationship), unlink_relationship(parent, relationship, child)))
+    return cases
+
+
+def run_case(ctx, case, fmt, args):
+    common.timed_requests(ctx.session, case.build(ctx, fmt, args.warmup))
+    repeats = []
+    all_samples = Histogram()
+    statuses = {}
+    for _ in range(args.repeats):
+        samples, elapsed, repeat_statuses = common.timed_requests(ctx.session, case.build(ctx, fmt, args.iterations))
+        repeats.append(common.summarize(samples, elapsed))
+        all_samples.merge(samples)
+        for status, count in repeat_statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    overall = common.summarize(all_samples, sum(repeat["seconds"] for repeat in repeats))
+    return {
+        "case": case.name,
+        "method": case.method,
+        "route": case.route,
+        "format": fmt,
+        "statuses": statuses,
+        "repeats": repeats,
+        "rps": sorted(repeat["rps"] for repeat in repeats)[len(repeats) // 2],
+        "latency_ms": overall["latency_ms"],
+        "histogram": overall["histogram"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput and latency of every route family the test suite covers")
+    common.add_server_arguments(parser)
+    common.add_run_arguments(parser, iterations=1000, warmup=100, repeats=3)
+    parser.add_argument("--formats", nargs="+", default=list(common.FORMATS), choices=list(common.FORMATS))
+    parser.add_argument("--cases", nargs="+", help="only run cases whose name contains one of these strings")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in all_cases() if not args.cases or any(text in case.name for text in args.cases)]
+    with common.server_for(args) as (base_url, server):
+        ctx = Context(common.new_session(), base_url)
+        data = dict(common.run_metadata(args, base_url), benchmark="endpoints", results=[])
+        for case in cases:
+            for fmt in args.formats:
+                result = run_case(ctx, case, fmt, args)
+                data["results"].append(result)
+                print("%-36s %-4s %8.0f req/s  p50 %6.2fms  p99 %6.2fms  p99.9 %6.2fms  %s" % (
+                    case.name, fmt, result["rps"], result["latency_ms"]["p50"], result["latency_ms"]["p99"],
+                    result["latency_ms"]["p99.9"], result["statuses"]))
+    print("results written to " + common.write_results("endpoints", args, data))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import argparse
+import json
+import sys
+import xml.etree.ElementTree as ET
+from benchmarks import common
+from benchmarks.seed import seed
+
+# Usage: python -m benchmarks.fallback [--sizes 100 1000 10000] [--max-bytes 1000000] [--max-p99-ms 500]
+#
+# A relationship read with an unknown or missing parent id doesn't 404, it returns the related items of
+# every parent, repeats included (see test_get_todos_id_tasksof_invalid_id and the projects/-1/categories
+# tests). One bad id therefore costs a response proportional to the whole relationship graph. This
+# grows the dataset and records how large and slow those responses get, exiting 1 once any of them
+# crosses --max-bytes or --max-p99-ms.
+
+ROUTES = (
+    "/todos/-1/tasksof",
+    "/todos/tasksof",
+    "/todos/-1/categories",
+    "/todos/categories",
+    "/projects/-1/tasks",
+    "/projects/tasks",
+    "/projects/-1/categories",
+    "/projects/categories",
+)
+
+
+def count_items(content, fmt):
+    # (entries, distinct ids) in the response, the root holds one array (JSON) or a flat list of children (XML)
+    if not content:
+        return 0, 0
+    if fmt == "json":
+        ids = [item.get("id") for items in json.loads(content).values() for item in items]
+    else:
+        ids = [child.findtext("id") for child in ET.fromstring(content)]
+    return len(ids), len(set(ids))
+
+
+def seed_up_to(base_url, size, present, args):
+    # Todos drive the size, projects and categories scale with them so every relationship grows
+    todos = size - present
+    return seed(base_url, todos=todos, projects=max(1, todos // args.todos_per_project), categories=max(1, todos // 100),
+                tasks_per_project=args.todos_per_project, categories_per_todo=args.categories_per_todo,
+                categories_per_project=args.categories_per_todo, seed=args.seed + size)
+
+
+def measure(session, base_url, route, fmt, size, args):
+    headers = common.headers_for(fmt)
+    requests_to_send = [("GET", base_url + route, headers, None)] * args.iterations
+    common.timed_requests(session, requests_to_send[:max(1, args.iterations // 10)])
+    samples, elapsed, statuses = common.timed_requests(session, requests_to_send)
+    content = session.get(base_url + route, headers=headers).content
+    summary = common.summarize(samples, elapsed)
+    items, distinct = count_items(content, fmt)
+    result = dict(summary, case="GET %s [n=%d]" % (route, size), route="GET " + route, size=size, format=fmt,
+                  statuses={str(status): n for status, n in statuses.items()}, bytes=len(content),
+                  items=items, distinct=distinct)
+    alerts = []
+    if result["bytes"] > args.max_bytes:
+        alerts.append("%d bytes > %d" % (result["bytes"], args.max_bytes))
+    if result["latency_ms"]["p99"] > args.max_p99_ms:
+        alerts.append("p99 %.1fms > %.1fms" % (result["latency_ms"]["p99"], args.max_p99_ms))
+    result["alerts"] = alerts
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Size and latency of the fallback relationship routes as the dataset grows")
+    common.add_server_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--formats", nargs="+", default=list(common.FORMATS), choices=list(common.FORMATS))
+    parser.add_argument("--todos-per-project", type=int, default=10)
+    parser.add_argument("--categories-per-todo", type=int, default=2)
+    parser.add_argument("--max-bytes", type=int, default=1000000)
+    parser.add_argument("--max-p99-ms", type=float, default=500.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with common.server_for(args) as (base_url, server):
+        session = common.new_session()
+        data = dict(common.run_metadata(args, base_url), benchmark="fallback", results=[],
+                    thresholds={"bytes": args.max_bytes, "p99_ms": args.max_p99_ms})
+        present = len(session.get(base_url + "/todos", headers=common.headers_for("json")).json()["todos"])
+        for size in sorted(args.sizes):
+            if size > present:
+                seeded = seed_up_to(base_url, size, present, args)
+                present = size
+                print("seeded up to %d todos and %d relationships in %.1fs" % (size, seeded.links, seeded.seconds))
+            for route in ROUTES:
+                for fmt in args.formats:
+                    result = measure(session, base_url, route, fmt, size, args)
+                    data["results"].append(result)
+                    print("%-40s %-4s p50 %8.2fms  p99 %8.2fms  %10d bytes  %7d items (%d distinct)%s" % (
+                        result["case"], fmt, result["latency_ms"]["p50"], result["latency_ms"]["p99"], result["bytes"],
+                        result["items"], result["distinct"], "  ALERT " + ", ".join(result["alerts"]) if result["alerts"] else ""))
+    data["growth"] = common.growth_fits(data["results"], "size")
+    print("results written to " + common.write_results("fallback", args, data))
+    return 1 if any(result["alerts"] for result in data["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
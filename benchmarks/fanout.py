@@ -0,0 +1,98 @@
+import argparse
+import sys
+from benchmarks import common
+from benchmarks.seed import seed
+
+# Usage: python -m benchmarks.fanout [--fan-outs 1 10 100 1000 10000 50000] [--formats json xml]
+#
+# For every fan-out a fresh hub project gets that many tasks and a fresh hub todo gets that many
+# projects (tasksof) and categories. Every link is timed as it is made, then the relationship reads
+# are timed, then the project's tasks are unlinked one by one.
+
+READS = {
+    "GET /projects/:id/tasks": "/projects/%s/tasks",
+    "GET /todos/:id/tasksof": "/todos/%s/tasksof",
+    "GET /todos/:id/categories": "/todos/%s/categories",
+}
+
+
+def create(session, base_url, collection, fields):
+    response = session.post(base_url + "/" + collection, json=fields, headers=common.headers_for("json"))
+    return response.json()["id"]
+
+
+def link_requests(base_url, path, child_ids):
+    # XML link bodies always answer 404 (see test_post_todos_id_tasksof_xml), so links are JSON only
+    headers = common.headers_for("json", body=True)
+    return [("POST", base_url + path, headers, common.encode_body("json", None, {"id": child_id})) for child_id in child_ids]
+
+
+def result_for(case_route, fan_out, fmt, samples, elapsed, statuses, items=1, **extra):
+    # items: relationship entries one request handles, the whole fan-out for reads and one for links
+    summary = common.summarize(samples, elapsed)
+    return dict(summary, case="%s [fan-out=%d]" % (case_route, fan_out), route=case_route, fan_out=fan_out, format=fmt,
+                statuses={str(status): n for status, n in statuses.items()},
+                us_per_item=summary["latency_ms"]["p50"] * 1000 / items, **extra)
+
+
+def run_fan_out(session, base_url, fan_out, args):
+    seeded = seed(base_url, todos=fan_out, projects=fan_out, categories=fan_out, seed=args.seed + fan_out)
+    project = create(session, base_url, "projects", {"title": "fan-out %d" % fan_out})
+    todo = create(session, base_url, "todos", {"title": "fan-out %d" % fan_out})
+    results = []
+
+    links = (
+        ("POST /projects/:id/tasks", "/projects/%s/tasks" % project, seeded.todos),
+        ("POST /todos/:id/tasksof", "/todos/%s/tasksof" % todo, seeded.projects),
+        ("POST /todos/:id/categories", "/todos/%s/categories" % todo, seeded.categories),
+    )
+    for route, path, children in links:
+        samples, elapsed, statuses = common.timed_requests(session, link_requests(base_url, path, children))
+        results.append(result_for(route, fan_out, "json", samples, elapsed, statuses))
+
+    for route, path in READS.items():
+        path = path % (project if route.startswith("GET /projects") else todo)
+        for fmt in args.formats:
+            requests_to_send = [("GET", base_url + path, common.headers_for(fmt), None)] * max(args.min_iterations, args.iterations // fan_out)
+            common.timed_requests(session, requests_to_send[:max(1, len(requests_to_send) // 10)])
+            samples, elapsed, statuses = common.timed_requests(session, requests_to_send)
+            size = len(session.get(base_url + path, headers=common.headers_for(fmt)).content)
+            results.append(result_for(route, fan_out, fmt, samples, elapsed, statuses, items=fan_out, bytes=size))
+
+    unlinks = [("DELETE", base_url + "/projects/%s/tasks/%s" % (project, child), common.headers_for("json"), None)
+               for child in seeded.todos]
+    samples, elapsed, statuses = common.timed_requests(session, unlinks)
+    results.append(result_for("DELETE /projects/:id/tasks/:id", fan_out, "json", samples, elapsed, statuses))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cost of relationship reads, links and unlinks as one parent's fan-out grows")
+    common.add_server_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="read requests at fan-out 1, divided by the fan-out above that")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--fan-outs", nargs="+", type=int, default=[1, 10, 100, 1000, 10000, 50000])
+    parser.add_argument("--formats", nargs="+", default=list(common.FORMATS), choices=list(common.FORMATS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with common.server_for(args) as (base_url, server):
+        session = common.new_session()
+        data = dict(common.run_metadata(args, base_url), benchmark="fanout", results=[])
+        for fan_out in sorted(args.fan_outs):
+            for result in run_fan_out(session, base_url, fan_out, args):
+                data["results"].append(result)
+                print("%-48s %-4s p50 %8.2fms  p99 %8.2fms  %10.3fus/item  %s" % (
+                    result["case"], result["format"], result["latency_ms"]["p50"], result["latency_ms"]["p99"],
+                    result["us_per_item"], result["statuses"]))
+    data["growth"] = common.growth_fits(data["results"], "fan_out")
+    for fit in data["growth"]:
+        print("%-32s %-4s fan-out^%.2f  %8.3fus/item  %s" % (
+            fit["case"], fit["format"], fit["exponent"], fit["us_per_item"], fit["growth"]))
+    print("results written to " + common.write_results("fanout", args, data))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
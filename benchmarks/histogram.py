@@ -0,0 +1,155 @@
+import array
+import base64
+import math
+import struct
+import zlib
+
+# Latency histogram in the HdrHistogram layout: values are counted in integer units of UNIT seconds,
+# split into buckets that each double the range of the last, every bucket cut into the same number of
+# linear sub-buckets. With SIGNIFICANT_DIGITS of 2 a sub-bucket is at most 1/128 of its values wide, so
+# any percentile is within 1% of the true sample whatever its magnitude. The counts live in one flat
+# array of a size fixed by the trackable range, a few thousand slots from a microsecond to an hour,
+# however many values get recorded. Histograms of the same layout merge by adding the arrays, and
+# serialize to a few hundred bytes, a few kilobytes for the widest spreads (to_bytes, or to_json as
+# stored in the results files).
+UNIT = 1e-6
+HIGHEST = 3600.0
+SIGNIFICANT_DIGITS = 2
+MAGIC = b"HDR1"
+# magic, significant digits, unit, highest trackable (units), count, max, min, then for every non-zero
+# slot the distance from the last one and its count, both as LEB128 varints
+HEADER = struct.Struct("<4sBdQQdd")
+
+
+class Histogram:
+
+    def __init__(self, unit=UNIT, highest=HIGHEST, significant_digits=SIGNIFICANT_DIGITS):
+        self.unit = unit
+        self.highest = max(2, int(round(highest / unit)))
+        self.significant_digits = significant_digits
+        # Smallest power of two sub-buckets that resolves `significant_digits` decimal digits
+        self.sub_bucket_magnitude = int(math.ceil(math.log2(2 * 10 ** significant_digits)))
+        self.sub_bucket_half_magnitude = self.sub_bucket_magnitude - 1
+        self.sub_bucket_half = 1 << self.sub_bucket_half_magnitude
+        self.sub_bucket_mask = (1 << self.sub_bucket_magnitude) - 1
+        buckets = 1
+        while (1 << (self.sub_bucket_magnitude + buckets - 1)) <= self.highest:
+            buckets += 1
+        self.counts = array.array("Q", bytes(8 * (buckets + 1) * self.sub_bucket_half))
+        self.count = 0
+        # Exact extremes in seconds, the buckets only know them to within their width
+        self.max = 0.0
+        self.min = 0.0
+
+    def layout(self):
+        return self.unit, self.highest, self.significant_digits
+
+    def index(self, units):
+        bucket = max(0, (units | self.sub_bucket_mask).bit_length() - self.sub_bucket_magnitude)
+        sub_bucket = units >> bucket
+        return ((bucket + 1) << self.sub_bucket_half_magnitude) + sub_bucket - self.sub_bucket_half
+
+    def bounds(self, index):
+        # [lowest, highest) in units of the values counted in a slot
+        bucket = (index >> self.sub_bucket_half_magnitude) - 1
+        sub_bucket = (index & (self.sub_bucket_half - 1)) + self.sub_bucket_half
+        if bucket < 0:
+            bucket, sub_bucket = 0, sub_bucket - self.sub_bucket_half
+        return sub_bucket << bucket, (sub_bucket + 1) << bucket
+
+    def record(self, value, count=1):
+        # Negative values (clock jitter) count as zero, values past the range as its top
+        value = max(value, 0.0)
+        units = min(int(value / self.unit), self.highest)
+        self.counts[self.index(units)] += count
+        self.min = value if not self.count else min(self.min, value)
+        self.max = max(self.max, value)
+        self.count += count
+
+    def merge(self, other):
+        if other.layout() != self.layout():
+            raise ValueError("cannot merge histograms of layout %s and %s" % (other.layout(), self.layout()))
+        if not other.count:
+            return self
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        return self
+
+    def value(self, index):
+        # Middle of the slot, kept within the exact extremes
+        lowest, highest = self.bounds(index)
+        return min(max((lowest + highest) / 2.0 * self.unit, self.min), self.max)
+
+    def percentile(self, pct):
+        # Nearest rank
+        if not self.count:
+            return 0.0
+        rank = min(max(math.ceil(pct / 100.0 * self.count), 1), self.count)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.value(index)
+        return self.max
+
+    def mean(self):
+        if not self.count:
+            return 0.0
+        return min(max(sum(self.value(index) * count for index, count in enumerate(self.counts) if count) / self.count,
+                       self.min), self.max)
+
+    def to_bytes(self):
+        data = bytearray(HEADER.pack(MAGIC, self.significant_digits, self.unit, self.highest, self.count, self.max, self.min))
+        last = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                write_varint(data, index - last)
+                write_varint(data, count)
+                last = index
+        return zlib.compress(bytes(data))
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = zlib.decompress(data)
+        magic, significant_digits, unit, highest, count, maximum, minimum = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a serialized histogram")
+        histogram = cls(unit=unit, highest=highest * unit, significant_digits=significant_digits)
+        offset = HEADER.size
+        index = 0
+        while offset < len(data):
+            gap, offset = read_varint(data, offset)
+            slot_count, offset = read_varint(data, offset)
+            index += gap
+            histogram.counts[index] = slot_count
+        histogram.count, histogram.max, histogram.min = count, maximum, minimum
+        return histogram
+
+    def to_json(self):
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_bytes(base64.b64decode(text))
+
+
+def write_varint(data, value):
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import aiohttp
+from benchmarks import common
+from benchmarks import endpoints
+from benchmarks.histogram import Histogram
+from tests.async_client import AsyncTodoManagerClient
+
+# Usage: python -m benchmarks.load [--rates 250 500 1000 2000] [--duration 10] [--mix "GET /todos=4" "POST /todos=1" ...]
+#
+# Open loop: requests leave on a fixed schedule, one every 1/rate seconds, however long earlier ones
+# take. Latency is counted from when a request was due, not from when it got sent, so time spent
+# waiting behind a slow response shows up in the histogram instead of being silently skipped
+# (coordinated omission). The service time measured from the actual send is reported next to it.
+#
+# The server falls behind once the unanswered backlog holds more than --max-backlog seconds of
+# arrivals. Each rate is run in turn, the highest one the server kept up with is its saturation point.
+# If the generator couldn't keep to the schedule itself the rate is flagged as client-bound.
+#
+# One Python process tops out well below what the jar can answer, so --processes spreads the schedule
+# over that many worker processes, each with its own event loop and connections. Worker k sends
+# requests k, k + P, k + 2P... of the one shared schedule, and sends back histograms rather than
+# samples; the report is built from their merge. More processes than cores only adds contention here.
+
+DEFAULT_MIX = (
+    "GET /todos=4",
+    "GET /todos/:id=4",
+    "GET /projects/:id=2",
+    "GET /projects/:id/tasks=2",
+    "GET /todos/:id/categories=1",
+    "POST /todos=1",
+    "POST /todos/:id=1",
+)
+WINDOW = 1.0
+# Seconds given to the workers to start up, per process on top of a fixed share
+STARTUP = 0.2
+# Median dispatch lag that means the generator itself couldn't keep up, occasional jitter is expected
+CLIENT_LAG = 0.005
+
+
+def parse_mix(entries):
+    # "GET /todos/:id=4" -> (case name, weight)
+    mix = []
+    for entry in entries:
+        name, _, weight = entry.rpartition("=")
+        mix.append((name.strip(), float(weight)) if name else (entry.strip(), 1.0))
+    return mix
+
+
+def split_counts(mix, total):
+    # Largest remainder, so the counts add up to exactly `total`
+    weights = sum(weight for _, weight in mix)
+    exact = [(name, total * weight / weights) for name, weight in mix]
+    counts = {name: int(share) for name, share in exact}
+    for name, share in sorted(exact, key=lambda item: item[1] - int(item[1]), reverse=True)[:total - sum(counts.values())]:
+        counts[name] += 1
+    return counts
+
+
+def build_plan(ctx, mix, fmt, total, rng):
+    cases = {case.name: case for case in endpoints.all_cases()}
+    unknown = [name for name, _ in mix if name not in cases]
+    if unknown:
+        raise ValueError("unknown routes in the mix: %s (known: %s)" % (", ".join(unknown), ", ".join(sorted(cases))))
+    plan = []
+    for name, count in split_counts(mix, total).items():
+        if count:
+            plan.extend((name, request) for request in cases[name].build(ctx, fmt, count))
+    rng.shuffle(plan)
+    return plan
+
+
+class WorkerResult:
+    # What one worker process measured, times relative to the schedule start. Every part merges by
+    # addition, so the parent never needs the samples themselves.
+
+    def __init__(self, windows):
+        self.corrected = Histogram()
+        self.service = Histogram()
+        self.lag = Histogram()
+        self.routes = {}
+        # Answers that landed in each window, and the latency of the requests due in it
+        self.answers = [0] * windows
+        self.window_latency = [Histogram() for _ in range(windows)]
+        self.statuses = {}
+        self.answered = 0
+        self.last = 0.0
+        self.cpu = 0.0
+
+    def record(self, name, due, sent, done, status):
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if sent is not None:
+            self.lag.record(sent - due)
+        if done is None:
+            return
+        self.answered += 1
+        self.last = max(self.last, done)
+        self.corrected.record(done - due)
+        self.service.record(done - sent)
+        self.routes.setdefault(name, Histogram()).record(done - due)
+        if int(done / WINDOW) < len(self.answers):
+            self.answers[int(done / WINDOW)] += 1
+        self.window_latency[min(int(due / WINDOW), len(self.answers) - 1)].record(done - due)
+
+    def merge(self, other):
+        self.corrected.merge(other.corrected)
+        self.service.merge(other.service)
+        self.lag.merge(other.lag)
+        for name, histogram in other.routes.items():
+            self.routes.setdefault(name, Histogram()).merge(histogram)
+        self.answers = [mine + theirs for mine, theirs in zip(self.answers, other.answers)]
+        for mine, theirs in zip(self.window_latency, other.window_latency):
+            mine.merge(theirs)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.answered += other.answered
+        self.last = max(self.last, other.last)
+        self.cpu += other.cpu
+        return self
+
+
+def run_worker(base_url, requests, start, rate, offset, step, connections, drain, windows):
+    # requests is this worker's share of the plan, the i-th one due at `start` (wall clock) plus
+    # (offset + i * step) / rate, so the shares of all workers interleave into one even schedule
+    return asyncio.run(_run_worker(base_url, requests, start, rate, offset, step, connections, drain, windows))
+
+
+async def _run_worker(base_url, requests, start, rate, offset, step, connections, drain, windows):
+    loop = asyncio.get_running_loop()
+    result = WorkerResult(windows)
+    sent = [None] * len(requests)
+    async with AsyncTodoManagerClient(base_url, connections=connections) as api:
+        origin = loop.time() + start - time.time()
+
+        async def fire(index, request):
+            method, url, headers, body = request
+            sent[index] = loop.time() - origin
+            try:
+                response = await api.request(method, url[len(base_url):], headers=headers, data=body)
+            except aiohttp.ClientError:
+                return
+            result.record(requests[index][0], (offset + index * step) / rate, sent[index], loop.time() - origin,
+                          response.status_code)
+            sent[index] = None
+
+        cpu = time.process_time()
+        tasks = []
+        for index, (_, request) in enumerate(requests):
+            delay = origin + (offset + index * step) / rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(fire(index, request)))
+        result.cpu = time.process_time() - cpu
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=drain)
+            for task in pending:
+                task.cancel()
+    # Requests still out after the drain never answered
+    for index, started in enumerate(sent):
+        if started is not None:
+            result.record(requests[index][0], (offset + index * step) / rate, started, None, None)
+    return result
+
+
+def windows(total, requests, rate):
+    # Per second of the schedule: arrivals, answers and the backlog left at its end
+    results = []
+    arrived = answered = 0
+    for window, answers in enumerate(total.answers):
+        arrivals = min(requests, math.ceil((window + 1) * WINDOW * rate)) - arrived
+        arrived += arrivals
+        answered += answers
+        results.append({
+            "second": window,
+            "arrivals": arrivals,
+            "answers": answers,
+            "backlog": arrived - answered,
+            "backlog_seconds": (arrived - answered) / rate,
+            "p99_ms": total.window_latency[window].percentile(99) * 1000,
+        })
+    return results
+
+
+def summarize_rate(total, requests, rate, processes, args):
+    duration = requests / rate
+    per_second = windows(total, requests, rate)
+    behind = next((window["second"] for window in per_second if window["backlog_seconds"] > args.max_backlog), None)
+    corrected, service, lag = (common.summarize(histogram, duration) for histogram in (total.corrected, total.service, total.lag))
+    return {
+        "offered_rps": rate,
+        "processes": processes,
+        "requests": requests,
+        "answered": total.answered,
+        "achieved_rps": total.answered / total.last if total.last else 0.0,
+        "latency_ms": corrected["latency_ms"],
+        "service_ms": service["latency_ms"],
+        "dispatch_lag_ms": lag["latency_ms"],
+        "histograms": {"latency": corrected["histogram"], "service": service["histogram"], "dispatch_lag": lag["histogram"]},
+        "client_cpu": total.cpu / duration if duration else 0.0,
+        "client_bound": total.lag.percentile(50) > CLIENT_LAG,
+        "statuses": total.statuses,
+        "routes": {name: common.summarize(histogram, duration) for name, histogram in sorted(total.routes.items())},
+        "windows": per_second,
+        "fell_behind_at": behind,
+        "kept_up": behind is None and total.answered == requests,
+    }
+
+
+def run_rate(base_url, plan, rate, args):
+    processes = max(1, min(args.processes, len(plan)))
+    if processes > (os.cpu_count() or 1):
+        print("warning: %d processes on %d cores, the generator will compete with itself" % (processes, os.cpu_count() or 1))
+    window_count = max(1, math.ceil(len(plan) / rate / WINDOW))
+    connections = max(1, args.connections // processes)
+    # Workers share a wall clock start, far enough out for every process to be up and connected
+    start = time.time() + STARTUP + STARTUP * processes
+    shares = [(plan[worker::processes], worker) for worker in range(processes)]
+    if processes == 1:
+        results = [run_worker(base_url, plan, start, rate, 0, 1, connections, args.drain, window_count)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(run_worker, base_url, share, start, rate, worker, processes, connections, args.drain,
+                                   window_count) for share, worker in shares]
+            results = [future.result() for future in futures]
+    total = WorkerResult(window_count)
+    for result in results:
+        total.merge(result)
+    return summarize_rate(total, len(plan), rate, processes, args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load at fixed arrival rates over a mix of routes")
+    common.add_server_arguments(parser)
+    parser.add_argument("--rates", nargs="+", type=float, default=[250, 500, 1000, 2000])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mix", nargs="+", default=list(DEFAULT_MIX))
+    parser.add_argument("--format", default="json", choices=list(common.FORMATS))
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--connections", type=int, default=256)
+    parser.add_argument("--max-backlog", type=float, default=0.5)
+    parser.add_argument("--drain", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.rates.sort()
+    mix = parse_mix(args.mix)
+
+    with common.server_for(args) as (base_url, server):
+        ctx = endpoints.Context(common.new_session(), base_url)
+        data = dict(common.run_metadata(args, base_url), benchmark="load", mix=dict(mix), cpu_count=os.cpu_count(), results=[])
+        for rate in args.rates:
+            # Fixtures for the whole run (targets to amend, delete or link) are made up front
+            plan = build_plan(ctx, mix, args.format, int(rate * args.duration), random.Random(args.seed))
+            result = run_rate(base_url, plan, rate, args)
+            data["results"].append(result)
+            print("offered %7.0f req/s  achieved %7.0f req/s  p50 %8.2fms  p99 %8.2fms  p99.9 %8.2fms  (service p99 %7.2fms)  %s%s%s" % (
+                rate, result["achieved_rps"], result["latency_ms"]["p50"], result["latency_ms"]["p99"],
+                result["latency_ms"]["p99.9"], result["service_ms"]["p99"], result["statuses"],
+                "" if result["fell_behind_at"] is None else "  FELL BEHIND in second %d" % (result["fell_behind_at"] + 1),
+                "  CLIENT BOUND (dispatch lag p50 %.1fms)" % result["dispatch_lag_ms"]["p50"] if result["client_bound"] else ""))
+    kept_up = [result["offered_rps"] for result in data["results"] if result["kept_up"] and not result["client_bound"]]
+    data["saturation_rps"] = max(kept_up) if kept_up else None
+    print("saturation: %s" % ("kept up with %.0f req/s" % data["saturation_rps"] if kept_up else "fell behind at every rate"))
+    print("results written to " + common.write_results("load", args, data))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+import aiohttp
+from benchmarks import common
+from benchmarks.histogram import Histogram
+from tests import client
+from tests.async_client import AsyncTodoManagerClient
+from tests.capture import DEFAULT_PATH
+from tests.trace import route_template
+
+# Usage: python -m benchmarks.replay [--capture requests.jsonl] [--speed 4] [--concurrency 8]
+#
+# Plays a capture of the functional suite (TODO_MANAGER_CAPTURE=1 python -m pytest) back against a
+# fresh server as a mixed workload nobody had to write by hand. --concurrency copies of the capture run
+# side by side. Within a copy every test's requests go out in their captured order, each one no earlier
+# than its captured offset divided by --speed (0 sends as fast as the order allows), and different
+# tests overlap as they did, or more as the speed goes up.
+#
+# Ids the capture created are rewritten: a request that names one, in its path or in an "id" field of
+# its body, waits until the copy's earlier requests naming it have answered, its own create first, and
+# uses the id that create got. Seeded and unknown ids go through unchanged. Answers that differ from the
+# captured status are counted as mismatches, a few of them are expected once copies and overlapping
+# tests share the seeded data.
+
+_BODY_ID = re.compile(r'("id"\s*:\s*"?|<id>)(-?\d+)')
+MISMATCH_EXAMPLES = 10
+
+
+def load_capture(path):
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    # Offsets from the first request, the capture started with the session before any test ran
+    for record in records:
+        record["offset"] -= records[0]["offset"] if records else 0.0
+    return records
+
+
+def created(record):
+    # (server, collection, id) a 201 created, from e.g. "Location: todos/3"
+    if record["status"] != 201 or not record["location"]:
+        return None
+    collection, _, created_id = record["location"].strip("/").rpartition("/")
+    return record["server"], collection.rpartition("/")[2], created_id
+
+
+def collections(path):
+    # The collection each path segment's id belongs to, /todos/3/tasksof/2 -> [None, None, todos, None, projects]
+    segments = path.split("/")
+    return [client.RELATED.get(segments[index - 1], segments[index - 1]) if index % 2 == 0 and index else None
+            for index in range(len(segments))]
+
+
+def references(record):
+    # [(segment index or body match, (server, collection, id))] for every id the request names
+    path = record["path"].partition("?")[0]
+    segments = path.split("/")
+    owners = collections(path)
+    found = [(index, (record["server"], collection, segments[index])) for index, collection in enumerate(owners) if collection]
+    if record["body"]:
+        # An id in the body is one of the collection the path ends in: a link target or the instance itself
+        target = owners[-1] if len(segments) % 2 else client.RELATED.get(segments[-1], segments[-1])
+        found.extend((match, (record["server"], target, match.group(2))) for match in _BODY_ID.finditer(record["body"]))
+    return found
+
+
+class Copy:
+    # One replay of the capture with its own ids
+
+    def __init__(self, records):
+        self.records = records
+        # (server, collection, captured id) -> the id this copy got for it
+        self.ids = {}
+        created_at = {}
+        for record in records:
+            key = created(record)
+            if key is not None:
+                created_at.setdefault(key, record["offset"])
+        # Requests naming the same created id go out in captured order, each once the one before has
+        # answered, whichever tests they belong to. Ids named before their create are left as they are.
+        self.done = [asyncio.Event() for _ in records]
+        self.after = []
+        last = {}
+        for index, record in enumerate(records):
+            keys = {key for _, key in references(record) if created_at.get(key, record["offset"]) < record["offset"]}
+            if created(record) is not None:
+                keys.add(created(record))
+            self.after.append([last[key] for key in keys if key in last])
+            for key in keys:
+                last[key] = index
+
+    async def wait_turn(self, index):
+        for earlier in self.after[index]:
+            await self.done[earlier].wait()
+
+    def rewrite(self, record):
+        path, _, query = record["path"].partition("?")
+        segments = path.split("/")
+        body = record["body"]
+        pieces = []
+        last = 0
+        for where, key in references(record):
+            if isinstance(where, int):
+                segments[where] = self.ids.get(key, key[2])
+            else:
+                pieces.extend((body[last:where.start(2)], self.ids.get(key, key[2])))
+                last = where.end(2)
+        if body:
+            body = "".join(pieces) + body[last:]
+        return "/".join(segments) + ("?" + query if query else ""), body
+
+    def finish(self, index, response):
+        key = created(self.records[index])
+        location = response.headers.get("Location") if response is not None and response.status_code == 201 else None
+        # A create that failed this time leaves the captured id, whatever names it then mismatches too
+        if key is not None and location:
+            self.ids[key] = location.strip("/").rpartition("/")[2]
+        self.done[index].set()
+
+
+class Replay:
+
+    def __init__(self, api, speed):
+        self.api = api
+        self.speed = speed
+        self.latency = Histogram()
+        self.routes = {}
+        self.statuses = {}
+        self.mismatches = 0
+        self.examples = []
+        self.origin = None
+
+    async def play(self, records):
+        copy = Copy(records)
+        streams = {}
+        for index, record in enumerate(records):
+            streams.setdefault(record["test"], []).append(index)
+        await asyncio.gather(*[self.play_stream(copy, stream) for stream in streams.values()])
+
+    async def play_stream(self, copy, indexes):
+        for index in indexes:
+            record = copy.records[index]
+            if self.speed:
+                delay = self.origin + record["offset"] / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await copy.wait_turn(index)
+            path, body = copy.rewrite(record)
+            # Left to itself aiohttp would label a request without a body application/octet-stream
+            skip = () if "Content-Type" in record["headers"] else ("Content-Type",)
+            response = None
+            sent = time.perf_counter()
+            try:
+                response = await self.api.request(record["method"], path, headers=record["headers"], data=body,
+                                                  skip_auto_headers=skip)
+            except aiohttp.ClientError:
+                pass
+            copy.finish(index, response)
+            self.record(record, path, response.status_code if response is not None else None, time.perf_counter() - sent)
+
+    def record(self, record, path, status, elapsed):
+        self.latency.record(elapsed)
+        self.routes.setdefault(record["method"] + " " + route_template(path), Histogram()).record(elapsed)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if status != record["status"]:
+            self.mismatches += 1
+            if len(self.examples) < MISMATCH_EXAMPLES:
+                self.examples.append("%s %s answered %s, captured %d (%s)" % (record["method"], path, status,
+                                                                           record["status"], record["test"]))
+
+
+async def run_replay(base_url, records, args):
+    async with AsyncTodoManagerClient(base_url, connections=args.connections) as api:
+        replay = Replay(api, args.speed)
+        replay.origin = time.perf_counter()
+        await asyncio.gather(*[replay.play(records) for _ in range(args.concurrency)])
+        return replay, time.perf_counter() - replay.origin
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured functional-suite traffic against a fresh server")
+    common.add_server_arguments(parser)
+    parser.add_argument("--capture", default=DEFAULT_PATH, help="written by TODO_MANAGER_CAPTURE=<path> python -m pytest")
+    parser.add_argument("--speed", type=float, default=1.0, help="multiple of the captured pace, 0 for as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=1, help="copies of the capture replayed side by side")
+    parser.add_argument("--connections", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    records = load_capture(args.capture)
+    if not records:
+        print("nothing captured in " + args.capture)
+        return 1
+    captured = records[-1]["offset"] - records[0]["offset"]
+    with common.server_for(args) as (base_url, server):
+        replay, elapsed = asyncio.run(run_replay(base_url, records, args))
+    data = dict(common.run_metadata(args, base_url), benchmark="replay", capture=args.capture, speed=args.speed,
+                concurrency=args.concurrency, captured_requests=len(records), captured_seconds=captured,
+                results=dict(common.summarize(replay.latency, elapsed), statuses=replay.statuses,
+                             mismatches=replay.mismatches, mismatch_examples=replay.examples,
+                             routes={route: common.summarize(histogram, elapsed) for route, histogram in sorted(replay.routes.items())}))
+    result = data["results"]
+    print("replayed %d requests (%d x %d captured over %.1fs) in %.1fs: %.0f req/s  p50 %.2fms  p99 %.2fms  p99.9 %.2fms  %s" % (
+        result["requests"], args.concurrency, len(records), captured, elapsed, result["rps"], result["latency_ms"]["p50"],
+        result["latency_ms"]["p99"], result["latency_ms"]["p99.9"], result["statuses"]))
+    print("%d answers differ from the capture%s" % (replay.mismatches, "".join("\n  " + example for example in replay.examples)))
+    print("results written to " + common.write_results("replay", args, data))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import argparse
+import sys
+from benchmarks import common
+from benchmarks.seed import seed
+
+# Usage: python -m benchmarks.scaling [--sizes 100 1000 10000 100000] [--formats json xml]
+#
+# Grows one server's todo collection through each size in turn and times full listing, single id
+# lookup and a filtered listing at every step, then fits latency ~ size^k per route and format.
+
+# Route -> the worst growth it is allowed to show before the run is flagged
+CASES = {
+    "GET /todos": "O(n)",
+    "GET /todos/:id": "O(1)",
+    "GET /todos?doneStatus=true": "O(n)",
+}
+LOOKUP_IDS = 100
+
+
+def todo_ids(session, base_url):
+    return [todo["id"] for todo in session.get(base_url + "/todos", headers=common.headers_for("json")).json()["todos"]]
+
+
+def list_iterations(args, size):
+    # Listings get proportionally fewer iterations so the largest sizes finish in comparable time
+    return max(args.min_iterations, args.iterations * args.sizes[0] // size)
+
+
+def build_requests(base_url, route, fmt, count, ids):
+    headers = common.headers_for(fmt)
+    if route == "GET /todos/:id":
+        return [("GET", base_url + "/todos/%s" % ids[i % len(ids)], headers, None) for i in range(count)]
+    return [("GET", base_url + route.split(" ", 1)[1], headers, None)] * count
+
+
+def run_size(session, base_url, size, ids, fmt, args):
+    results = []
+    # Spread lookups over the whole id range so a single hot entry doesn't hide a scan
+    lookup_ids = ids[::max(1, len(ids) // LOOKUP_IDS)]
+    for route in CASES:
+        count = args.iterations if route == "GET /todos/:id" else list_iterations(args, size)
+        # Warm-up of a tenth of the measured requests
+        common.timed_requests(session, build_requests(base_url, route, fmt, max(1, count // 10), lookup_ids))
+        samples, elapsed, statuses = common.timed_requests(session, build_requests(base_url, route, fmt, count, lookup_ids))
+        method, path = build_requests(base_url, route, fmt, 1, lookup_ids)[0][:2]
+        summary = common.summarize(samples, elapsed)
+        results.append(dict(summary, case="%s [n=%d]" % (route, size), route=route, size=size, format=fmt,
+                            statuses={str(status): n for status, n in statuses.items()},
+                            bytes=len(session.request(method, path, headers=common.headers_for(fmt)).content)))
+    return results
+
+
+def check_growth(fits):
+    for fit in fits:
+        fit["expected"] = CASES[fit["case"]]
+        fit["exceeded"] = common.growth_rank(fit["growth"]) > common.growth_rank(fit["expected"])
+    return fits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency of listing, lookup and filtering as the todo collection grows")
+    common.add_server_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000, 100000])
+    parser.add_argument("--formats", nargs="+", default=list(common.FORMATS), choices=list(common.FORMATS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.sizes.sort()
+
+    with common.server_for(args) as (base_url, server):
+        session = common.new_session()
+        data = dict(common.run_metadata(args, base_url), benchmark="scaling", results=[])
+        # A --url server may already hold todos, they count towards the first size and get looked up too
+        ids = todo_ids(session, base_url)
+        present = len(ids)
+        for size in args.sizes:
+            if size > present:
+                seeded = seed(base_url, todos=size - present, seed=args.seed + size)
+                ids.extend(seeded.todos)
+                present = size
+                print("seeded up to %d todos in %.1fs" % (size, seeded.seconds))
+            for fmt in args.formats:
+                for result in run_size(session, base_url, size, ids, fmt, args):
+                    data["results"].append(result)
+                    print("%-40s %-4s p50 %8.2fms  p99 %8.2fms  %10d bytes  %s" % (
+                        result["case"], fmt, result["latency_ms"]["p50"], result["latency_ms"]["p99"], result["bytes"],
+                        result["statuses"]))
+    data["growth"] = check_growth(common.growth_fits(data["results"], "size"))
+    for fit in data["growth"]:
+        print("%-28s %-4s size^%.2f  %8.3fus/item  %-11s (expected %s)%s" % (
+            fit["case"], fit["format"], fit["exponent"], fit["us_per_item"], fit["growth"], fit["expected"],
+            "  GROWTH REGRESSION" if fit["exceeded"] else ""))
+    print("results written to " + common.write_results("scaling", args, data))
+    return 1 if any(fit["exceeded"] for fit in data["growth"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from tests import client
+from tests.async_client import AsyncTodoManagerClient
+
+# Usage: python -m benchmarks.seed --todos 100000 --projects 1000 --categories 50 --tasks-per-project 20 --url http://localhost:4567
+#
+# The jar has no bulk load route (POST /admin/data/thingifier only clears data), so everything is
+# created through the API over a bounded pool of keep-alive connections.
+
+RETRIES = 5
+
+
+class SeedError(Exception):
+    pass
+
+
+class SeededData:
+
+    def __init__(self):
+        self.todos = []
+        self.projects = []
+        self.categories = []
+        self.links = 0
+        self.seconds = 0.0
+
+    @property
+    def objects(self):
+        return len(self.todos) + len(self.projects) + len(self.categories)
+
+
+def plan_relationships(rng, parents, children, fan_out):
+    # parent index -> child indexes, drawn up front so the layout only depends on the seed
+    if not children or fan_out <= 0:
+        return {}
+    return {parent: rng.sample(range(children), min(fan_out, children)) for parent in range(parents)}
+
+
+async def _send(request, *args):
+    # Concurrent relationship changes can hit the server's unsynchronised lists, so retry those
+    for attempt in range(RETRIES):
+        response = await request(*args)
+        if response.status_code < 400:
+            return response
+        if b"ConcurrentModificationException" not in response.content:
+            break
+        await asyncio.sleep(0.001 * 2 ** attempt)
+    raise SeedError("%s%r failed with %d: %s" % (request.__name__, args, response.status_code, response.content[:200]))
+
+
+async def _create_all(specs, create):
+    responses = await asyncio.gather(*[_send(create, *spec) for spec in specs])
+    return [response.json()["id"] for response in responses]
+
+
+async def _link_parent(link, parent_id, child_ids):
+    # One parent's links go one after another, different parents run concurrently
+    for child_id in child_ids:
+        await _send(link, parent_id, child_id)
+    return len(child_ids)
+
+
+async def seed_async(base_url, todos=0, projects=0, categories=0, tasks_per_project=0, categories_per_todo=0,
+                     categories_per_project=0, seed=0, connections=64):
+    rng = random.Random(seed)
+    data = SeededData()
+    started = time.perf_counter()
+    todo_specs = [("todo %d" % i, rng.random() < 0.3, "seeded todo %d" % i) for i in range(todos)]
+    project_specs = [("project %d" % i, rng.random() < 0.2, rng.random() < 0.5, "seeded project %d" % i) for i in range(projects)]
+    category_specs = [("category %d" % i, "seeded category %d" % i) for i in range(categories)]
+    project_tasks = plan_relationships(rng, projects, todos, tasks_per_project)
+    todo_categories = plan_relationships(rng, todos, categories, categories_per_todo)
+    project_categories = plan_relationships(rng, projects, categories, categories_per_project)
+
+    async with AsyncTodoManagerClient(base_url, connections=connections) as api:
+        data.todos, data.projects, data.categories = await asyncio.gather(
+            _create_all(todo_specs, api.create_todo),
+            _create_all(project_specs, api.create_project),
+            _create_all(category_specs, api.create_category))
+        links = []
+        for parent, children in project_tasks.items():
+            links.append(_link_parent(api.link_project_task, data.projects[parent], [data.todos[c] for c in children]))
+        for parent, children in todo_categories.items():
+            links.append(_link_parent(api.link_todo_category, data.todos[parent], [data.categories[c] for c in children]))
+        for parent, children in project_categories.items():
+            links.append(_link_parent(api.link_project_category, data.projects[parent], [data.categories[c] for c in children]))
+        data.links = sum(await asyncio.gather(*links))
+    data.seconds = time.perf_counter() - started
+    return data
+
+
+def seed(base_url, **kwargs):
+    return asyncio.run(seed_async(base_url, **kwargs))
+
+
+def add_seed_arguments(parser):
+    parser.add_argument("--todos", type=int, default=0)
+    parser.add_argument("--projects", type=int, default=0)
+    parser.add_argument("--categories", type=int, default=0)
+    parser.add_argument("--tasks-per-project", type=int, default=0)
+    parser.add_argument("--categories-per-todo", type=int, default=0)
+    parser.add_argument("--categories-per-project", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connections", type=int, default=64)
+
+
+def seed_arguments(args):
+    return {
+        "todos": args.todos,
+        "projects": args.projects,
+        "categories": args.categories,
+        "tasks_per_project": args.tasks_per_project,
+        "categories_per_todo": args.categories_per_todo,
+        "categories_per_project": args.categories_per_project,
+        "seed": args.seed,
+        "connections": args.connections,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a deterministic dataset into a todo manager server")
+    parser.add_argument("--url", default=client.BASE_URL)
+    add_seed_arguments(parser)
+    args = parser.parse_args(argv)
+    data = seed(args.url.rstrip("/"), **seed_arguments(args))
+    print("seeded %d todos, %d projects, %d categories and %d relationships in %.2fs (%.0f requests/s)" % (
+        len(data.todos), len(data.projects), len(data.categories), data.links, data.seconds,
+        (data.objects + data.links) / data.seconds if data.seconds else 0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
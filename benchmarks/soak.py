@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import time
+import aiohttp
+from benchmarks import common
+from benchmarks.histogram import Histogram
+from tests.async_client import AsyncTodoManagerClient
+from tests.server import JAVA
+
+# Usage: python -m benchmarks.soak [--duration 10800] [--rate 50] [--workers 4] [--window 60] [--sample 10]
+#
+# Runs a steady mixed workload for hours against the jar it launched and watches what builds up. Every
+# worker repeats one cycle: create a todo and a project, link them, link the todo to the seeded category
+# 1 and project 1, read them back, unlink, delete both. Requests leave at --rate in total however many
+# workers there are, so a slower server shows up as latency rather than as less load.
+#
+# Every --sample seconds the JVM's resident set comes from /proc/<pid>/status and its heap from
+# jstat -gc, together with how many todos, projects and categories exist and how many tasks project 1
+# holds; a finished cycle leaves none behind, so any that stay are leaked objects or relationships.
+# Latency is kept per route and per --window seconds. The report flags:
+#   - memory growth: the floor of a series (its lowest value in each sixth of the run, after GC) never
+#     falls, rises from most sixths to the next and still over the second half, by more than
+#     --max-growth overall. One step up followed by a plateau is the heap settling, not a leak.
+#   - leftovers: the floor of an object count grows the same way, by more than one cycle in flight per
+#     worker
+#   - latency drift: a route's p50 over the last third of the windows is more than --max-drift above
+#     the first third
+# all of them leaving out the first --warmup seconds. The exit status is 1 if anything was flagged.
+
+# Seeded instances every cycle links to, shared by all workers
+SEEDED_CATEGORY = "1"
+SEEDED_PROJECT = "1"
+# The run is cut into this many parts for the memory floors and object counts
+SEGMENTS = 6
+# Steps between consecutive parts whose floor has to rise for a series to count as growing
+RISING_STEPS = SEGMENTS - 2
+SERIES = ("rss_kb", "heap_used_kb", "old_used_kb", "todos", "projects", "categories", "project_tasks")
+
+
+def find_jstat():
+    # TODO_MANAGER_JSTAT, then the PATH, then next to the java that runs the jar
+    found = os.environ.get("TODO_MANAGER_JSTAT") or shutil.which("jstat")
+    java = shutil.which(JAVA)
+    if not found and java:
+        sibling = os.path.join(os.path.dirname(os.path.realpath(java)), "jstat")
+        found = sibling if os.access(sibling, os.X_OK) else None
+    return found
+
+
+def read_rss(pid):
+    with open("/proc/%d/status" % pid) as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return None
+
+
+async def read_heap(jstat, pid):
+    # jstat -gc prints a header line and a value line, sizes in KB
+    process = await asyncio.create_subprocess_exec(jstat, "-gc", str(pid), stdout=asyncio.subprocess.PIPE,
+                                                   stderr=asyncio.subprocess.DEVNULL)
+    output, _ = await process.communicate()
+    lines = output.decode().split()
+    if process.returncode or len(lines) % 2:
+        return {}
+    columns = dict(zip(lines[:len(lines) // 2], lines[len(lines) // 2:]))
+    used = sum(float(columns.get(column, 0)) for column in ("S0U", "S1U", "EU", "OU"))
+    return {"heap_used_kb": used, "old_used_kb": float(columns.get("OU", 0)), "young_gcs": int(columns.get("YGC", 0)),
+            "full_gcs": int(columns.get("FGC", 0))}
+
+
+class Soak:
+
+    def __init__(self, api, args):
+        self.api = api
+        self.args = args
+        self.started = time.perf_counter()
+        self.next_slot = self.started
+        # Route -> histogram of the window in progress, and of the whole run
+        self.current = {}
+        self.totals = {}
+        self.windows = []
+        self.samples = []
+        self.statuses = {}
+        self.cycles = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    async def call(self, route, method, path, **kwargs):
+        # Claim the next slot of the shared schedule, a backlog is never sent as a burst
+        self.next_slot = max(self.next_slot, time.perf_counter()) + 1.0 / self.args.rate
+        delay = self.next_slot - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent = time.perf_counter()
+        response = await self.api.request(method, path, **kwargs)
+        elapsed = time.perf_counter() - sent
+        self.current.setdefault(route, Histogram()).record(elapsed)
+        self.totals.setdefault(route, Histogram()).record(elapsed)
+        self.statuses[str(response.status_code)] = self.statuses.get(str(response.status_code), 0) + 1
+        return response
+
+    async def cycle(self, worker):
+        todo = project = None
+        try:
+            response = await self.call("POST /todos", "POST", "/todos", json={"title": "soak todo %d" % worker})
+            if response.status_code == 201:
+                todo = response.json()["id"]
+            response = await self.call("POST /projects", "POST", "/projects", json={"title": "soak project %d" % worker})
+            if response.status_code == 201:
+                project = response.json()["id"]
+            if todo is None or project is None:
+                return
+            await self.call("POST /projects/:id/tasks", "POST", "/projects/%s/tasks" % project, json={"id": todo})
+            await self.call("POST /todos/:id/categories", "POST", "/todos/%s/categories" % todo, json={"id": SEEDED_CATEGORY})
+            await self.call("POST /projects/:id/tasks", "POST", "/projects/%s/tasks" % SEEDED_PROJECT, json={"id": todo})
+            await self.call("GET /todos/:id", "GET", "/todos/" + todo)
+            await self.call("GET /projects/:id/tasks", "GET", "/projects/%s/tasks" % project)
+            await self.call("GET /todos/:id/categories", "GET", "/todos/%s/categories" % todo)
+            await self.call("GET /projects/:id/tasks", "GET", "/projects/%s/tasks" % SEEDED_PROJECT)
+            await self.call("GET /todos", "GET", "/todos")
+            await self.call("DELETE /projects/:id/tasks/:id", "DELETE", "/projects/%s/tasks/%s" % (project, todo))
+        finally:
+            # Whatever got created goes, also when a create failed or a dropped connection cut the cycle
+            # short, so only the server can leave objects behind. The links to the seeded project and
+            # category go with the todo, or are left behind if they leak.
+            try:
+                if todo is not None:
+                    await self.call("DELETE /todos/:id", "DELETE", "/todos/" + todo)
+            finally:
+                if project is not None:
+                    await self.call("DELETE /projects/:id", "DELETE", "/projects/" + project)
+        self.cycles += 1
+
+    async def worker(self, worker, deadline):
+        while time.perf_counter() < deadline:
+            try:
+                await self.cycle(worker)
+            except aiohttp.ClientError:
+                # A dropped connection costs the rest of the cycle, not the run
+                self.statuses["error"] = self.statuses.get("error", 0) + 1
+
+    async def close_windows(self, deadline):
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(min(self.args.window, max(0.0, deadline - time.perf_counter())))
+            finished, self.current = self.current, {}
+            self.windows.append({
+                "seconds": self.elapsed(),
+                "routes": {route: {"requests": histogram.count, "p50_ms": histogram.percentile(50) * 1000,
+                                   "p99_ms": histogram.percentile(99) * 1000} for route, histogram in sorted(finished.items())},
+            })
+
+    async def count(self, path, key):
+        response = await self.api.get(path)
+        return len(response.json()[key]) if response.status_code == 200 else None
+
+    async def sample(self, pid, jstat):
+        sample = {"seconds": self.elapsed(), "cycles": self.cycles}
+        if pid is not None:
+            sample["rss_kb"] = read_rss(pid)
+            if jstat:
+                sample.update(await read_heap(jstat, pid))
+        for collection in ("todos", "projects", "categories"):
+            sample[collection] = await self.count("/" + collection, collection)
+        sample["project_tasks"] = await self.count("/projects/%s/tasks" % SEEDED_PROJECT, "todos")
+        self.samples.append(sample)
+        return sample
+
+    async def sample_until(self, deadline, pid, jstat):
+        while time.perf_counter() < deadline:
+            sample = await self.sample(pid, jstat)
+            print("%7.1f min  %6d cycles  rss %s  heap %s  old %s  todos %s  projects %s  categories %s  project %s tasks %s" % (
+                sample["seconds"] / 60, sample["cycles"], megabytes(sample.get("rss_kb")), megabytes(sample.get("heap_used_kb")),
+                megabytes(sample.get("old_used_kb")), sample["todos"], sample["projects"], sample["categories"],
+                SEEDED_PROJECT, sample["project_tasks"]))
+            await asyncio.sleep(min(self.args.sample, max(0.0, deadline - time.perf_counter())))
+
+
+def megabytes(kb):
+    return "%.1fMB" % (kb / 1024.0) if kb is not None else "-"
+
+
+def floors(samples, key):
+    # Lowest value of each part of the run: the level left after garbage collection or finished cycles
+    values = [(sample["seconds"], sample[key]) for sample in samples if sample.get(key) is not None]
+    if len(values) < SEGMENTS:
+        return []
+    size = len(values) / float(SEGMENTS)
+    return [min(value for _, value in values[int(part * size):int((part + 1) * size)]) for part in range(SEGMENTS)]
+
+
+def check_growth(samples, args):
+    # Samples from the warm-up would count the JVM filling its heap for the first time as growth
+    samples = [sample for sample in samples if sample["seconds"] > args.warmup]
+    findings = {}
+    for key in SERIES:
+        lows = floors(samples, key)
+        if not lows:
+            continue
+        points = [(sample["seconds"] / 3600.0, sample[key]) for sample in samples if sample.get(key) is not None]
+        steps = list(zip(lows, lows[1:]))
+        rising = (all(later >= earlier for earlier, later in steps)
+                  and sum(later > earlier for earlier, later in steps) >= RISING_STEPS
+                  and lows[-1] > lows[SEGMENTS // 2 - 1])
+        if key.endswith("_kb"):
+            flagged = rising and lows[-1] > lows[0] * (1 + args.max_growth)
+        else:
+            flagged = rising and lows[-1] - lows[0] > args.workers
+        findings[key] = {"floors": lows, "per_hour": common.fit_slope([x for x, _ in points], [y for _, y in points]),
+                         "flagged": flagged}
+    return findings
+
+
+def check_drift(windows, args):
+    measured = [window for window in windows if window["seconds"] > args.warmup]
+    third = len(measured) // 3
+    findings = {}
+    if not third:
+        return findings
+    for route in sorted({route for window in measured for route in window["routes"]}):
+        series = [(window["seconds"] / 3600.0, window["routes"][route]) for window in measured if route in window["routes"]]
+        first = sorted(entry["p50_ms"] for _, entry in series[:third])
+        last = sorted(entry["p50_ms"] for _, entry in series[-third:])
+        if not first or not last:
+            continue
+        before, after = first[len(first) // 2], last[len(last) // 2]
+        drift = (after - before) / before if before else 0.0
+        findings[route] = {"first_p50_ms": before, "last_p50_ms": after, "drift": drift,
+                           "p50_ms_per_hour": common.fit_slope([x for x, _ in series], [entry["p50_ms"] for _, entry in series]),
+                           "flagged": drift > args.max_drift}
+    return findings
+
+
+async def run_soak(base_url, pid, args):
+    jstat = find_jstat() if pid is not None else None
+    if pid is None:
+        print("no launched jar, memory is not sampled")
+    elif not jstat:
+        print("jstat not found (set TODO_MANAGER_JSTAT), heap is not sampled")
+    async with AsyncTodoManagerClient(base_url, connections=args.workers + 1) as api:
+        soak = Soak(api, args)
+        deadline = soak.started + args.duration
+        await asyncio.gather(soak.sample_until(deadline, pid, jstat), soak.close_windows(deadline),
+                             *[soak.worker(worker, deadline) for worker in range(args.workers)])
+        await soak.sample(pid, jstat)
+        return soak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hours of mixed create/link/delete load, watching JVM memory and latency drift")
+    common.add_server_arguments(parser)
+    parser.add_argument("--duration", type=float, default=3 * 3600.0, help="seconds")
+    parser.add_argument("--rate", type=float, default=50.0, help="requests per second over all workers")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--window", type=float, default=60.0, help="seconds per latency window")
+    parser.add_argument("--sample", type=float, default=10.0, help="seconds between memory samples")
+    parser.add_argument("--warmup", type=float, default=300.0, help="seconds of windows left out of the drift check")
+    parser.add_argument("--max-growth", type=float, default=0.1)
+    parser.add_argument("--max-drift", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    with common.server_for(args) as (base_url, server):
+        soak = asyncio.run(run_soak(base_url, server.pid if server is not None else None, args))
+    data = dict(common.run_metadata(args, base_url), benchmark="soak", duration=args.duration, rate=args.rate,
+                workers=args.workers, cycles=soak.cycles, statuses=soak.statuses, samples=soak.samples, windows=soak.windows,
+                routes={route: common.summarize(histogram, args.duration) for route, histogram in sorted(soak.totals.items())},
+                growth=check_growth(soak.samples, args), drift=check_drift(soak.windows, args))
+    print("%d cycles, %s" % (soak.cycles, soak.statuses))
+    for key, finding in data["growth"].items():
+        print("%-14s floors %s  %+.1f/hour%s" % (key, " ".join("%.0f" % low for low in finding["floors"]), finding["per_hour"],
+                                                 "  GROWING" if finding["flagged"] else ""))
+    for route, finding in data["drift"].items():
+        print("%-32s p50 %7.2fms -> %7.2fms  %+6.1f%%  %+.2fms/hour%s" % (
+            route, finding["first_p50_ms"], finding["last_p50_ms"], finding["drift"] * 100, finding["p50_ms_per_hour"],
+            "  DRIFT" if finding["flagged"] else ""))
+    print("results written to " + common.write_results("soak", args, data))
+    flagged = [finding for finding in list(data["growth"].values()) + list(data["drift"].values()) if finding["flagged"]]
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
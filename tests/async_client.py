@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+import aiohttp
+from tests import client
+
+DEFAULT_CONNECTIONS = 100
+
+
+class AsyncResponse:
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncTodoManagerClient:
+    # At most `connections` sockets are opened and kept alive; extra requests queue for a free one
+
+    def __init__(self, base_url=None, connections=DEFAULT_CONNECTIONS):
+        self.base_url = base_url
+        self.connections = connections
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=self.connections,
+                                         keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, headers=client.JSON_HEADERS)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def url(self, path):
+        return (self.base_url or client.BASE_URL) + path
+
+    async def request(self, method, path, **kwargs):
+        started = time.perf_counter()
+        if method.upper() not in client.SAFE_METHODS:
+            client.invalidate(method, self.url(path))
+        async with self.session.request(method, self.url(path), **kwargs) as response:
+            ttfb = time.perf_counter() - started
+            content = await response.read()
+        if method.upper() not in client.SAFE_METHODS:
+            client.invalidate(method, self.url(path))
+            client.record_mutation(method, self.url(path), response.status, response.headers)
+        # What aiohttp sent, rebuilt from the arguments: session headers, then json= or data=
+        headers = dict(client.JSON_HEADERS, **(kwargs.get("headers") or {}))
+        body = kwargs.get("data")
+        if "json" in kwargs:
+            headers.setdefault("Content-Type", "application/json")
+            body = json.dumps(kwargs["json"])
+        # Connections are opened inside aiohttp's connector, so connect time isn't split out
+        client.notify_request(method, str(response.url), response.status, len(content), None, ttfb,
+                              time.perf_counter() - started, headers, body, response.headers.get("Location"))
+        return AsyncResponse(response.status, response.headers, content)
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def head(self, path, **kwargs):
+        return await self.request("HEAD", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.request("PUT", path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request("DELETE", path, **kwargs)
+
+    async def gather(self, *requests):
+        return await asyncio.gather(*requests)
+
+    # todos
+
+    async def create_todo(self, title, done_status=False, description=""):
+        return await self.post("/todos", json={"title": title, "doneStatus": done_status, "description": description})
+
+    async def get_todo(self, todo_id):
+        return await self.get("/todos/" + todo_id)
+
+    async def delete_todo(self, todo_id):
+        return await self.delete("/todos/" + todo_id)
+
+    async def get_todo_categories(self, todo_id):
+        return await self.get("/todos/" + todo_id + "/categories")
+
+    async def link_todo_category(self, todo_id, category_id):
+        return await self.post("/todos/" + todo_id + "/categories", json={"id": category_id})
+
+    async def get_todo_tasksof(self, todo_id):
+        return await self.get("/todos/" + todo_id + "/tasksof")
+
+    # projects
+
+    async def create_project(self, title, completed=False, active=False, description=""):
+        return await self.post("/projects", json={"title": title, "completed": completed, "active": active,
+                                                  "description": description})
+
+    async def get_project(self, project_id):
+        return await self.get("/projects/" + project_id)
+
+    async def delete_project(self, project_id):
+        return await self.delete("/projects/" + project_id)
+
+    async def get_project_tasks(self, project_id):
+        return await self.get("/projects/" + project_id + "/tasks")
+
+    async def link_project_task(self, project_id, todo_id):
+        return await self.post("/projects/" + project_id + "/tasks", json={"id": todo_id})
+
+    async def unlink_project_task(self, project_id, todo_id):
+        return await self.delete("/projects/" + project_id + "/tasks/" + todo_id)
+
+    async def get_project_categories(self, project_id):
+        return await self.get("/projects/" + project_id + "/categories")
+
+    async def link_project_category(self, project_id, category_id):
+        return await self.post("/projects/" + project_id + "/categories", json={"id": category_id})
+
+    # categories
+
+    async def create_category(self, title, description=""):
+        return await self.post("/categories", json={"title": title, "description": description})
+
+    async def get_category(self, category_id):
+        return await self.get("/categories/" + category_id)
+
+    async def delete_category(self, category_id):
+        return await self.delete("/categories/" + category_id)
@@ -0,0 +1,51 @@
+import unittest
+from tests import cassette
+from tests import fake_server
+from tests import trace
+from tests.async_client import AsyncTodoManagerClient
+from tests.helper_functions import elements_equal, json_diff, json_equal, xml_diff
+from tests.reset import reset_state
+
+
+class ApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Every test starts from the seeded dataset, no per-object teardown needed
+        trace.enter_phase("setup")
+        reset_state()
+        trace.enter_phase("call")
+
+    def tearDown(self):
+        trace.enter_phase("teardown")
+
+    def assertElementsEqual(self, actual, expected):
+        # Order-insensitive, reports the differing paths instead of two full documents
+        if not elements_equal(actual, expected):
+            self.fail("XML differs:\n" + "\n".join(xml_diff(actual, expected)))
+
+    def assertJsonEqual(self, actual, expected):
+        # Arrays of id-bearing objects compare as sets keyed by id
+        if not json_equal(actual, expected):
+            self.fail("JSON differs:\n" + "\n".join(json_diff(actual, expected)))
+
+
+class AsyncApiTestCase(unittest.IsolatedAsyncioTestCase):
+
+    connections = 100
+
+    def setUp(self):
+        if cassette.active():
+            self.skipTest("concurrency tests don't run against cassettes")
+        if fake_server.FAKE:
+            self.skipTest("concurrency tests don't run against the fake, it serves one request at a time")
+        trace.enter_phase("setup")
+        reset_state()
+
+    async def asyncSetUp(self):
+        self.client = AsyncTodoManagerClient(connections=self.connections)
+        await self.client.open()
+        trace.enter_phase("call")
+
+    async def asyncTearDown(self):
+        trace.enter_phase("teardown")
+        await self.client.close()
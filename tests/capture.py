@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from tests import client
+from tests.server import ROOT_DIR
+
+# TODO_MANAGER_CAPTURE=<path> writes every request the suite sends, with its headers and body, to <path>
+# as JSON lines when the session ends, ready for python -m benchmarks.replay. TODO_MANAGER_CAPTURE=1
+# writes to requests.jsonl at the root of the repo, which git ignores. Each line also keeps the test
+# that sent it, when it started and what the server answered, so the replay can keep every test's
+# requests in order and rewrite the ids created along the way.
+CAPTURE_PATH = os.environ.get("TODO_MANAGER_CAPTURE")
+DEFAULT_PATH = os.path.join(ROOT_DIR, "requests.jsonl")
+
+# Set by the HTTP client per connection, replaying them would only fight the replaying client's own
+TRANSPORT_HEADERS = ("connection", "content-length", "host", "user-agent", "accept-encoding")
+
+
+class Capture:
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        self.test = None
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def start_test(self, test):
+        with self.lock:
+            self.test = test
+
+    def finish_test(self):
+        with self.lock:
+            self.test = None
+
+    def record(self, record):
+        parts = urlsplit(record["url"])
+        path = parts.path + ("?" + parts.query if parts.query else "")
+        headers = {name: value for name, value in record["request_headers"].items() if name.lower() not in TRANSPORT_HEADERS}
+        with self.lock:
+            self.records.append({
+                # Seconds from the start of the capture to when the request was sent
+                "offset": time.perf_counter() - record["total"] - self.started,
+                "test": self.test,
+                "method": record["method"],
+                "server": "%s://%s" % (parts.scheme, parts.netloc),
+                "path": path,
+                "headers": headers,
+                "body": record["request_body"],
+                "status": record["status"],
+                "location": record["location"],
+            })
+
+    def write(self):
+        with open(self.path, "w") as f:
+            for record in sorted(self.records, key=lambda record: record["offset"]):
+                f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+capture = None
+
+
+def configure(path=CAPTURE_PATH):
+    global capture
+    if path and capture is None:
+        capture = Capture(DEFAULT_PATH if path == "1" else path)
+        client.add_request_hook(capture.record)
+    return capture
+
+
+def start_test(test):
+    if capture is not None:
+        capture.start_test(test)
+
+
+def finish_test():
+    if capture is not None:
+        capture.finish_test()
+
+
+def close():
+    global capture
+    finished, capture = capture, None
+    if finished is not None:
+        client.remove_request_hook(finished.record)
+        finished.write()
+    return finished
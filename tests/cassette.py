@@ -0,0 +1,236 @@
+import http.client
+import io
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from collections import deque
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from tests import client
+from tests.helper_functions import elements_equal, json_equal
+from tests.server import ROOT_DIR
+
+# TODO_MANAGER_CASSETTE picks how the suite talks to the server:
+#   record - run against the live server and save every request/response pair of each test
+#   replay - serve the saved responses in-process, no JVM is started
+#   verify - run against the live server and report every response that drifted from the cassette
+# Async tests are skipped in every mode: they exercise server concurrency that a recording can't stand
+# in for, and the objects they create race for ids, which would shift every id recorded after them.
+# Cassettes live in TODO_MANAGER_CASSETTE_DIR, one file per test module, e.g.
+# tests/cassettes/todos/test_todos.json. Ids come from the server's counters, so record and verify
+# the same selection of tests against a freshly started server.
+CASSETTE_MODE = os.environ.get("TODO_MANAGER_CASSETTE")
+CASSETTE_DIR = os.environ.get("TODO_MANAGER_CASSETTE_DIR", os.path.join(ROOT_DIR, "tests", "cassettes"))
+
+# Headers that change on every run or only describe the transport
+OMITTED_HEADERS = ("Date", "Server", "Transfer-Encoding")
+
+
+class CassetteError(Exception):
+    pass
+
+
+def cassette_path(test):
+    # tests/todos/test_todos.py::TestTodos::test_x -> (<dir>/todos/test_todos.json, TestTodos::test_x)
+    module, _, name = test.partition("::")
+    module = os.path.relpath(os.path.join(ROOT_DIR, module), os.path.join(ROOT_DIR, "tests"))
+    return os.path.join(CASSETTE_DIR, os.path.splitext(module)[0] + ".json"), name
+
+
+def request_key(request):
+    body = request.body
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "surrogateescape")
+    return "%s %s %s" % (request.method, request.path_url, body or "")
+
+
+def interaction(request, response):
+    return {
+        "request": request_key(request),
+        "status": response.status_code,
+        "headers": {name: value for name, value in response.headers.items() if name not in OMITTED_HEADERS},
+        "body": response.content.decode("utf-8", "surrogateescape"),
+    }
+
+
+def bodies_equal(content_type, actual, expected):
+    # Collections come back in any order, compare them the way the tests do
+    try:
+        if "json" in content_type:
+            return json_equal(json.loads(actual), json.loads(expected))
+        if "xml" in content_type:
+            return elements_equal(ET.fromstring(actual), ET.fromstring(expected))
+    except (ValueError, ET.ParseError):
+        # e.g. the empty body of a HEAD response
+        pass
+    return actual == expected
+
+
+class Cassette:
+
+    def __init__(self, mode, directory=CASSETTE_DIR):
+        self.mode = mode
+        self.directory = directory
+        self.files = {}
+        # Interactions of the running test, queued per request so setup traffic can go unmatched
+        self.pending = {}
+        self.recorded = {}
+        self.drifts = []
+        self.test = None
+        self.lock = threading.Lock()
+
+    def load(self, path):
+        if path not in self.files:
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.files[path] = json.load(f)
+            else:
+                self.files[path] = {}
+        return self.files[path]
+
+    def start_test(self, test):
+        with self.lock:
+            self.test = test
+            self.pending = {}
+            if self.mode == "record":
+                self.recorded.setdefault(test, [])
+                return
+            path, name = cassette_path(test)
+            for saved in self.load(path).get(name, []):
+                self.pending.setdefault(saved["request"], deque()).append(saved)
+
+    def finish_test(self):
+        with self.lock:
+            self.test = None
+            self.pending = {}
+
+    def next_interaction(self, key):
+        with self.lock:
+            queued = self.pending.get(key)
+            return queued.popleft() if queued else None
+
+    def replay(self, request):
+        saved = self.next_interaction(request_key(request))
+        if saved is None:
+            raise CassetteError("no recorded response for %s in %s, record it with TODO_MANAGER_CASSETTE=record"
+                                % (request_key(request), self.test))
+        response = requests.Response()
+        response.status_code = saved["status"]
+        response.reason = http.client.responses.get(saved["status"], "")
+        response.headers = CaseInsensitiveDict(saved["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(saved["body"].encode("utf-8", "surrogateescape"))
+        response.url = request.url
+        response.request = request
+        return response
+
+    def capture(self, request, response):
+        live = interaction(request, response)
+        if self.mode == "record":
+            with self.lock:
+                if self.test is not None:
+                    self.recorded[self.test].append(live)
+            return
+        saved = self.next_interaction(live["request"])
+        if saved is None:
+            self.drift(live["request"], "not in the cassette")
+            return
+        if live["status"] != saved["status"]:
+            self.drift(live["request"], "status %d != %d" % (live["status"], saved["status"]))
+        content_type = live["headers"].get("Content-Type", "")
+        if content_type != saved["headers"].get("Content-Type", ""):
+            self.drift(live["request"], "Content-Type %r != %r" % (content_type, saved["headers"].get("Content-Type")))
+        elif not bodies_equal(content_type, live["body"], saved["body"]):
+            self.drift(live["request"], "body %r != %r" % (live["body"][:80], saved["body"][:80]))
+
+    def drift(self, key, difference):
+        with self.lock:
+            self.drifts.append({"test": self.test, "request": key, "difference": difference})
+
+    def save(self):
+        changed = set()
+        for test, interactions in self.recorded.items():
+            path, name = cassette_path(test)
+            self.load(path)[name] = interactions
+            changed.add(path)
+        for path in changed:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                # One test per line keeps re-recordings reviewable as diffs
+                f.write("{\n" + ",\n".join("%s: %s" % (json.dumps(name), json.dumps(self.files[path][name], separators=(",", ":")))
+                                           for name in sorted(self.files[path])) + "\n}\n")
+        return sorted(changed)
+
+
+class ReplayAdapter(BaseAdapter):
+
+    def __init__(self, cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        return self.cassette.replay(request)
+
+    def close(self):
+        pass
+
+
+class CapturingAdapter(client.PooledAdapter):
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.cassette.capture(request, response)
+        return response
+
+
+cassette = None
+
+
+def configure(mode=CASSETTE_MODE, session=None):
+    global cassette
+    if not mode:
+        return None
+    if mode not in ("record", "replay", "verify"):
+        raise ValueError("unknown cassette mode: %s" % mode)
+    session = session or client.session
+    cassette = Cassette(mode)
+    if mode == "replay":
+        adapter = ReplayAdapter(cassette)
+    else:
+        adapter = CapturingAdapter(cassette, pool_connections=client.POOL_CONNECTIONS, pool_maxsize=client.POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return cassette
+
+
+def active():
+    return cassette is not None
+
+
+def replaying():
+    return cassette is not None and cassette.mode == "replay"
+
+
+def start_test(test):
+    if cassette is not None:
+        cassette.start_test(test)
+
+
+def finish_test():
+    if cassette is not None:
+        cassette.finish_test()
+
+
+def close():
+    global cassette
+    finished, cassette = cassette, None
+    if finished is not None and finished.mode == "record":
+        finished.save()
+    return finished
@@ -0,0 +1,407 @@
+import copy
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+BASE_URL = os.environ.get("TODO_MANAGER_URL", "http://localhost:4567")
+JSON_HEADERS = {'Accept': 'application/json'}
+XML_HEADERS = {'Accept': 'application/xml'}
+
+POOL_CONNECTIONS = int(os.environ.get("TODO_MANAGER_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.environ.get("TODO_MANAGER_POOL_MAXSIZE", "32"))
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Every GET and HEAD goes to the server unless TODO_MANAGER_RESPONSE_CACHE=1, then request() answers a
+# repeated GET or HEAD from memory until some session sends a mutation that could change it, see _stale.
+RESPONSE_CACHE = os.environ.get("TODO_MANAGER_RESPONSE_CACHE", "0") not in ("", "0")
+CACHED_METHODS = ("GET", "HEAD")
+ENTITIES = ("todos", "projects", "categories")
+# Relationship name -> the collection its items come from
+RELATED = {"tasks": "todos", "tasksof": "projects", "todos": "todos", "projects": "projects", "categories": "categories"}
+
+# Server state touched since the last reset, see tests/reset.py. "changed" holds the mutations that
+# deleting "created" won't undo, e.g. "PUT /todos/1" or "DELETE /projects/1/tasks/2" on seeded data.
+_state_lock = threading.Lock()
+_state = {"mutations": 0, "created": [], "changed": []}
+
+# Counters shared by every pool the session creates
+_stats_lock = threading.Lock()
+_stats = {"opened": 0, "checkouts": 0}
+
+# (method, url, headers) -> _CacheEntry
+_CacheEntry = namedtuple("_CacheEntry", "server route query references response")
+_cache_lock = threading.Lock()
+_cache = {}
+_cache_state = {"enabled": RESPONSE_CACHE, "generation": 0, "hits": 0, "misses": 0, "invalidated": 0}
+
+# Callables given one dict per request, see add_request_hook
+_request_hooks = []
+# Seconds the current thread's last request spent opening a connection
+_timing = threading.local()
+
+
+class _TimingMixin:
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            _timing.connect = getattr(_timing, "connect", 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnection(_TimingMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimingMixin, HTTPSConnection):
+    pass
+
+
+class _CountingMixin:
+
+    def _new_conn(self):
+        with _stats_lock:
+            _stats["opened"] += 1
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        with _stats_lock:
+            _stats["checkouts"] += 1
+        return super()._get_conn(timeout=timeout)
+
+
+class _CountingHTTPConnectionPool(_CountingMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(_CountingMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        # Every session is built on this adapter, so mutations from any of them reach the cache. Invalidating
+        # on both sides stops a GET that overlaps the mutation from caching what it read before it landed.
+        if request.method not in SAFE_METHODS:
+            invalidate(request.method, request.url)
+            try:
+                return super().send(request, **kwargs)
+            finally:
+                invalidate(request.method, request.url)
+        return super().send(request, **kwargs)
+
+
+def new_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    session = requests.Session()
+    adapter = PooledAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=False)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(JSON_HEADERS)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+session = new_session()
+
+
+def url(path):
+    if path.startswith("http://") or path.startswith("https://"):
+        return path
+    return BASE_URL + path
+
+
+def set_base_url(base_url):
+    global BASE_URL
+    BASE_URL = base_url.rstrip("/")
+    clear_cache()
+
+
+def request(method, path, **kwargs):
+    key = _cache_key(method, url(path), kwargs)
+    if key is not None:
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry is not None:
+                _cache_state["hits"] += 1
+                return _copy(entry.response)
+            _cache_state["misses"] += 1
+            generation = _cache_state["generation"]
+    _timing.connect = 0.0
+    started = time.perf_counter()
+    response = session.request(method, url(path), **kwargs)
+    if key is not None:
+        _store(key, generation, response)
+    if method.upper() not in SAFE_METHODS:
+        record_mutation(method, url(path), response.status_code, response.headers)
+    if _request_hooks:
+        # elapsed stops once the headers are parsed, streamed bodies are not read yet
+        size = int(response.headers.get("Content-Length", 0)) if kwargs.get("stream") else len(response.content)
+        notify_request(method, response.url, response.status_code, size, _timing.connect,
+                       response.elapsed.total_seconds(), time.perf_counter() - started,
+                       response.request.headers, response.request.body, response.headers.get("Location"))
+    return response
+
+
+def _cache_key(method, request_url, kwargs):
+    # Only plain reads are cached: a body, stream or other request option could change the answer
+    if not _cache_state["enabled"] or method.upper() not in CACHED_METHODS or set(kwargs) - {"headers"}:
+        return None
+    headers = {name.lower(): value for name, value in session.headers.items()}
+    headers.update((name.lower(), value) for name, value in (kwargs.get("headers") or {}).items())
+    return method.upper(), request_url, tuple(sorted(headers.items()))
+
+
+def _copy(response):
+    # Every caller gets its own response, changing one (its headers, say) doesn't reach the cached entry
+    copied = copy.copy(response)
+    copied.headers = response.headers.copy()
+    copied.request = response.request.copy() if response.request is not None else None
+    return copied
+
+
+def _store(key, generation, response):
+    entry = _cache_entry(key[1], response)
+    with _cache_lock:
+        # A mutation ran while this request was in flight, what it read may already be stale
+        if entry is not None and generation == _cache_state["generation"]:
+            _cache[key] = entry
+
+
+def _route(request_url):
+    # /todos/1/tasksof -> ["todos", "1", "tasksof"], None for routes outside the entities
+    segments = [segment for segment in urlsplit(request_url).path.split("/") if segment]
+    return segments if segments and segments[0] in ENTITIES else None
+
+
+def _cache_entry(request_url, response):
+    route = _route(request_url)
+    if route is None:
+        return None
+    references = _references(response)
+    if references is not None and len(route) > 1:
+        references.add((route[0], route[1]))
+    parts = urlsplit(request_url)
+    return _CacheEntry(parts.netloc, tuple(route), parts.query, references, _copy(response))
+
+
+def _collections(route):
+    # Collections a route renders: /todos/1/tasksof -> {todos, projects}
+    if len(route) > 2 and route[2] in RELATED:
+        return {route[0], RELATED[route[2]]}
+    return {route[0]}
+
+
+def _references(response):
+    # (collection, id) of every instance the body renders, relationship ids included. None when the
+    # body doesn't say, e.g. for HEAD, and such entries go on any change to an instance.
+    try:
+        if "json" in response.headers.get("Content-Type", ""):
+            body = response.json()
+            if len(body) != 1:
+                return None
+            name, items = next(iter(body.items()))
+            if name not in ENTITIES:
+                # Error messages only depend on the route itself
+                return set() if response.status_code >= 400 else None
+            references = set()
+            for item in items:
+                references.add((name, str(item["id"])))
+                references.update((RELATED[field], str(linked["id"]))
+                                  for field, value in item.items() if field in RELATED for linked in value)
+            return references
+        if "xml" in response.headers.get("Content-Type", ""):
+            root = ET.fromstring(response.content)
+            if root.tag not in ENTITIES:
+                return set() if response.status_code >= 400 else None
+            references = set()
+            for item in root:
+                references.add((root.tag, item.findtext("id")))
+                references.update((RELATED[field.tag], linked.text)
+                                  for field in item if field.tag in RELATED for linked in field.iter("id"))
+            return references
+    except (ValueError, KeyError, TypeError, AttributeError, ET.ParseError):
+        pass
+    return None
+
+
+def invalidate(method, request_url):
+    # Drops cached responses of the same server that a mutating request may change
+    route = _route(request_url)
+    netloc = urlsplit(request_url).netloc
+    with _cache_lock:
+        _cache_state["generation"] += 1
+        stale = [key for key, entry in _cache.items() if entry.server == netloc and _stale(entry, method, route)]
+        for key in stale:
+            del _cache[key]
+        _cache_state["invalidated"] += len(stale)
+
+
+def _stale(entry, method, route):
+    if route is None:
+        # e.g. /admin/data/thingifier, assume it changed everything
+        return True
+    if len(route) > 2:
+        # Link changes, and creations through a relationship: every route reading either side
+        return bool(_collections(entry.route) & _collections(route))
+    if entry.route == (route[0],) or (entry.query and route[0] in _collections(entry.route)):
+        # Any change to a collection can move instances in or out of its listings and filtered reads,
+        # e.g. amending doneStatus changes what /todos?doneStatus=true lists without it naming the instance
+        return True
+    unknown = entry.references is None
+    if len(route) == 1:
+        # Beyond the listings, a creation shows up where a missing id may now resolve (error responses,
+        # fallback relationship reads of an unknown parent) and in what the entry can't vouch for
+        return entry.route[0] == route[0] and (len(entry.route) != 2 or unknown or entry.response.status_code >= 400)
+    if method.upper() in ("PUT", "DELETE"):
+        # Replacing or deleting an instance also clears its links and their reverses, so beyond its own
+        # renderings it reaches relationship reads of its collection (the fallback routes list the links
+        # of every parent)
+        return unknown or (route[0], route[1]) in entry.references or (len(entry.route) > 2 and entry.route[0] == route[0])
+    # Amending only changes the instance's own fields, relationships aren't fields
+    return unknown or (route[0], route[1]) in entry.references
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache_state["generation"] += 1
+        _cache.clear()
+
+
+def enable_cache(enabled=True):
+    clear_cache()
+    _cache_state["enabled"] = enabled
+
+
+def cache_stats():
+    with _cache_lock:
+        return {name: _cache_state[name] for name in ("hits", "misses", "invalidated")}
+
+
+def add_request_hook(hook):
+    # hook(record) runs after every request this module or the async client sends, where record
+    # has method, url, status, bytes and connect/ttfb/total seconds (connect is None when unknown),
+    # plus the request_headers and request_body sent and the Location answered, if any
+    _request_hooks.append(hook)
+
+
+def remove_request_hook(hook):
+    _request_hooks.remove(hook)
+
+
+def notify_request(method, request_url, status, size, connect, ttfb, total, headers=None, body=None, location=None):
+    if not _request_hooks:
+        return
+    record = {
+        "method": method.upper(),
+        "url": request_url,
+        "status": status,
+        "bytes": size,
+        "connect": connect,
+        "ttfb": ttfb,
+        "total": total,
+        "request_headers": dict(headers or {}),
+        "request_body": body.decode("utf-8", "replace") if isinstance(body, bytes) else body,
+        "location": location,
+    }
+    for hook in list(_request_hooks):
+        hook(record)
+
+
+def record_mutation(method, request_url, status_code, headers):
+    path = urlsplit(request_url).path
+    with _state_lock:
+        _state["mutations"] += 1
+        # The server answers every creation with e.g. "Location: todos/3"
+        location = headers.get("Location")
+        if status_code == 201 and location:
+            _state["created"].append("/" + location.lstrip("/"))
+        # Amends, replacements, deletions and link changes of instances the test didn't create, a creation
+        # through one of their relationships included. A rejected request is taken to have changed nothing,
+        # the suite sends plenty of those to seeded ids. What happens to a created instance goes with it.
+        touches_existing = "/".join(path.split("/")[:3]) not in _state["created"] and path.count("/") > 1
+        if status_code < 400 and touches_existing:
+            _state["changed"].append("%s %s" % (method.upper(), path))
+
+
+def get(path, **kwargs):
+    return request("GET", path, **kwargs)
+
+
+def head(path, **kwargs):
+    return request("HEAD", path, **kwargs)
+
+
+def post(path, **kwargs):
+    return request("POST", path, **kwargs)
+
+
+def put(path, **kwargs):
+    return request("PUT", path, **kwargs)
+
+
+def delete(path, **kwargs):
+    return request("DELETE", path, **kwargs)
+
+
+def is_dirty():
+    with _state_lock:
+        return _state["mutations"] > 0
+
+
+def created_locations():
+    with _state_lock:
+        return list(_state["created"])
+
+
+def changed_paths():
+    # Mutations since the last reset that only a fresh server undoes, see record_mutation
+    with _state_lock:
+        return list(_state["changed"])
+
+
+def track_for_cleanup(path):
+    # Deleted by the next reset along with created instances, newest first, e.g. a link whose parent
+    # outlives the reset. The link request itself then no longer counts as a change to seeded state.
+    with _state_lock:
+        _state["mutations"] += 1
+        _state["created"].append(path)
+        link = "POST " + path.rpartition("/")[0]
+        if link in _state["changed"]:
+            _state["changed"].remove(link)
+
+
+def mark_clean():
+    with _state_lock:
+        _state["mutations"] = 0
+        _state["created"] = []
+        _state["changed"] = []
+
+
+def connection_stats():
+    with _stats_lock:
+        opened = _stats["opened"]
+        checkouts = _stats["checkouts"]
+    return {"opened": opened, "reused": max(checkouts - opened, 0), "requests": checkouts}
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        _stats["opened"] = 0
+        _stats["checkouts"] = 0
@@ -0,0 +1,105 @@
+import time
+from tests import capture
+from tests import cassette
+from tests import client
+from tests import fake_server
+from tests import reset
+from tests import server
+from tests import trace
+
+_session_started = time.perf_counter()
+# The tracer, capture and cassette are closed at session finish, before the terminal summary reads them
+_finished_trace = None
+_finished_capture = None
+_finished_cassette = None
+
+
+def pytest_sessionstart(session):
+    global _session_started
+    _session_started = time.perf_counter()
+    if cassette.configure() is not None:
+        # Cassettes record and match every request of each test, none may be answered from memory
+        client.enable_cache(False)
+    if capture.configure() is not None:
+        # The capture is replayed as load, so reads the cache would answer still have to be sent
+        client.enable_cache(False)
+    if cassette.replaying():
+        # Responses come from the cassettes, there is no server state to reset
+        reset.configure(mode="none")
+    elif fake_server.FAKE:
+        fake = fake_server.start_session_fake()
+        client.set_base_url(fake.base_url)
+        reset.configure(fake)
+    else:
+        reset.configure(server.start_session_server(client.BASE_URL))
+    trace.configure()
+
+
+def pytest_runtest_setup(item):
+    cassette.start_test(item.nodeid)
+    capture.start_test(item.nodeid)
+    trace.start_test(item.nodeid)
+
+
+def pytest_runtest_call(item):
+    # unittest runs setUp inside the call phase, ApiTestCase switches back to setup around it
+    trace.enter_phase("call")
+
+
+def pytest_runtest_teardown(item):
+    trace.enter_phase("teardown")
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    trace.finish_test()
+    capture.finish_test()
+    cassette.finish_test()
+
+
+def pytest_sessionfinish(session):
+    global _finished_trace, _finished_capture, _finished_cassette
+    _finished_trace = trace.close()
+    _finished_capture = capture.close()
+    _finished_cassette = cassette.close()
+    if _finished_cassette is not None and _finished_cassette.drifts:
+        session.exitstatus = 1
+
+
+def pytest_unconfigure(config):
+    reset.close()
+    server.stop_session_server()
+    fake_server.stop_session_fake()
+
+
+def pytest_terminal_summary(terminalreporter):
+    stats = client.connection_stats()
+    terminalreporter.write_sep("-", "todo manager connections")
+    terminalreporter.write_line("requests: %d, connections opened: %d, reused: %d" % (stats["requests"], stats["opened"], stats["reused"]))
+    cached = client.cache_stats()
+    terminalreporter.write_line("response cache: %d hits, %d misses, %d invalidated" % (cached["hits"], cached["misses"], cached["invalidated"]))
+    if server.session_server is not None:
+        metrics = server.session_server.metrics
+        total = time.perf_counter() - _session_started
+        terminalreporter.write_sep("-", "todo manager server")
+        terminalreporter.write_line("jvm start: %.3fs, time to first response: %.3fs (%d probes), suite total: %.3fs" % (
+            metrics["jvm_start_seconds"], metrics["time_to_first_response_seconds"], metrics["readiness_probes"], total))
+    if _finished_trace is not None:
+        terminalreporter.write_sep("-", "slowest tests (setup / call / teardown)")
+        for test in _finished_trace.slowest_tests():
+            terminalreporter.write_line("%7.3fs  %6.3fs / %6.3fs / %6.3fs  %4d requests  %s" % (
+                test["total"], test["setup"], test["call"], test["teardown"], test["requests"], test["test"]))
+        terminalreporter.write_sep("-", "slowest routes")
+        for route in _finished_trace.slowest_routes():
+            terminalreporter.write_line("%7.3fs  %5d requests  p50 %6.2fms  max %7.2fms  ttfb %6.2fms  %7d bytes  %s" % (
+                route["total"], route["requests"], route["p50"] * 1000, route["max"] * 1000, route["ttfb"] * 1000,
+                route["bytes"], route["route"]))
+        terminalreporter.write_line("request trace written to " + _finished_trace.path)
+    if _finished_capture is not None:
+        terminalreporter.write_line("%d requests captured to %s" % (len(_finished_capture.records), _finished_capture.path))
+    if _finished_cassette is not None and _finished_cassette.mode == "record":
+        terminalreporter.write_line("cassettes recorded for %d tests in %s" % (len(_finished_cassette.recorded), _finished_cassette.directory))
+    elif _finished_cassette is not None and _finished_cassette.mode == "verify":
+        terminalreporter.write_sep("-", "cassette drift")
+        for drift in _finished_cassette.drifts:
+            terminalreporter.write_line("%s: %s: %s" % (drift["test"], drift["request"], drift["difference"]))
+        terminalreporter.write_line("%d responses drifted from the cassettes" % len(_finished_cassette.drifts))
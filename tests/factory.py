@@ -0,0 +1,136 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tests import cassette
+from tests import client
+
+# Creates what a test needs before the part it actually checks. Everything goes through tests.client,
+# so created instances are deleted by the next reset like any other, and links from instances that
+# outlive the reset are unlinked first (deleting only the child leaves such a link dangling).
+#
+#     todos = factory.create_many("todos", [{"title": "a"}, {"title": "b"}])
+#     project = factory.build("projects", [{"title": "School Work", "tasks": [{"title": "essay"}, {"id": "1"}]}])[0]
+#     project["tasks"][0]["id"]
+#
+# Independent requests run concurrently over the pooled session, one batch per level of a graph. A
+# child given as a spec is created and linked in one request through its parent's relationship route,
+# a child given as {"id": ...} is an existing instance that only gets linked.
+WORKERS = int(os.environ.get("TODO_MANAGER_FACTORY_WORKERS", "8"))
+RETRIES = 5
+
+DEFAULTS = {
+    "todos": {"title": "factory todo"},
+    "projects": {"title": "factory project"},
+    "categories": {"title": "factory category"},
+}
+# (collection, relationship) -> collection its children live in
+RELATIONSHIPS = {
+    ("todos", "tasksof"): "projects",
+    ("todos", "categories"): "categories",
+    ("projects", "tasks"): "todos",
+    ("projects", "categories"): "categories",
+    ("categories", "todos"): "todos",
+    ("categories", "projects"): "projects",
+}
+
+
+class FactoryError(Exception):
+    pass
+
+
+def _send(method, path, fields=None):
+    # Concurrent relationship changes can hit the server's unsynchronised lists, so retry those
+    for attempt in range(RETRIES):
+        response = client.request(method, path, json=fields, headers=client.JSON_HEADERS)
+        if response.status_code < 400:
+            return response
+        if b"ConcurrentModificationException" not in response.content:
+            break
+        time.sleep(0.001 * 2 ** attempt)
+    raise FactoryError("%s %s %r failed with %d: %s" % (method, path, fields, response.status_code, response.content[:200]))
+
+
+def _run(calls):
+    # Cassettes need every id in recording order, so they get one request at a time
+    workers = 1 if cassette.active() else min(WORKERS, len(calls))
+    if workers <= 1:
+        return [call() for call in calls]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda call: call(), calls))
+
+
+def _fields(collection, spec):
+    return dict(DEFAULTS[collection], **spec)
+
+
+def create(collection, **fields):
+    return create_many(collection, [fields])[0]
+
+
+def create_many(collection, specs):
+    # specs is a list of field dicts or a count of default instances, results keep their order
+    if isinstance(specs, int):
+        specs = [{}] * specs
+    return _run([lambda spec=spec: _send("POST", "/" + collection, _fields(collection, spec)).json() for spec in specs])
+
+
+def link(collection, parent_id, relationship, child_id):
+    link_many([(collection, parent_id, relationship, child_id)])
+
+
+def link_many(links):
+    # (collection, parent id, relationship, child id) tuples. One parent's links go one after another,
+    # different parents run concurrently.
+    by_parent = {}
+    for collection, parent_id, relationship, child_id in links:
+        by_parent.setdefault((collection, str(parent_id)), []).append((relationship, str(child_id), None))
+    _run([lambda parent=parent, children=children: _attach(parent, children) for parent, children in by_parent.items()])
+
+
+def build(collection, specs):
+    # Field dicts whose relationship keys hold child specs, nested as deep as needed. Returns the instances
+    # with each relationship key replaced by its children, created ones carrying their fields. A spec with
+    # an "id", root or child, stands for that existing instance.
+    new = [{name: value for name, value in spec.items() if (collection, name) not in RELATIONSHIPS}
+           for spec in specs if "id" not in spec]
+    created = iter(create_many(collection, new))
+    nodes = [{"id": str(spec["id"])} if "id" in spec else next(created) for spec in specs]
+    level = [(collection, node, spec) for node, spec in zip(nodes, specs)]
+    while level:
+        by_parent = {}
+        for collection, node, spec in level:
+            for name, children in spec.items():
+                if (collection, name) in RELATIONSHIPS:
+                    node[name] = [None] * len(children)
+                    by_parent.setdefault((collection, node["id"]), []).extend(
+                        (name, child.get("id"), (node, index, child)) for index, child in enumerate(children))
+        level = []
+        for placed in _run([lambda parent=parent, children=children: _attach(parent, children)
+                            for parent, children in by_parent.items()]):
+            level.extend(placed)
+    return nodes
+
+
+def _attach(parent, children):
+    # children are (relationship, existing child id or None, (node, index, spec) or None). A new child is
+    # created by the link request itself. Returns (collection, child node, spec) for the next level.
+    collection, parent_id = parent
+    outlives_reset = "/%s/%s" % parent not in client.created_locations()
+    placed = []
+    for relationship, child_id, placement in children:
+        target = RELATIONSHIPS[(collection, relationship)]
+        path = "/%s/%s/%s" % (collection, parent_id, relationship)
+        if child_id is not None:
+            _send("POST", path, {"id": str(child_id)})
+            child = {"id": str(child_id)}
+        else:
+            spec = placement[2]
+            child = _send("POST", path, _fields(target, {name: value for name, value in spec.items()
+                                                         if (target, name) not in RELATIONSHIPS})).json()
+        if outlives_reset:
+            client.track_for_cleanup("%s/%s" % (path, child["id"]))
+        if placement is not None:
+            node, index, spec = placement
+            node[relationship][index] = child
+            placed.append((target, child, spec))
+    return placed
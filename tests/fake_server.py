@@ -0,0 +1,632 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# In-memory stand-in for runTodoManagerRestAPI-1.5.5.jar -model=todoManager, quirks included: failed
+# creations still use up an id (test_post_todos_json_id_gap), relationship reads with an unknown parent
+# return every parent's items, XML values are typed like org.json does (<title>7</title> is "7.0"),
+# PUT drops relationships and DELETE leaves one-way links to the deleted instance dangling.
+# TodoManagerModel.handle() answers one request in-process, FakeTodoManagerServer serves it over HTTP.
+# TODO_MANAGER_FAKE=1 runs the suite against it; requests are handled one at a time, so it has none of
+# the jar's concurrency bugs and the async tests are skipped.
+FAKE = os.environ.get("TODO_MANAGER_FAKE", "") not in ("", "0")
+
+JSON_TYPE = "application/json"
+XML_TYPE = "application/xml"
+HTML_TYPE = "text/html;charset=utf-8"
+
+
+class Field:
+
+    def __init__(self, name, kind="string", mandatory=False, not_empty=False):
+        self.name = name
+        self.kind = kind
+        self.mandatory = mandatory
+        self.not_empty = not_empty
+
+    @property
+    def default(self):
+        return "false" if self.kind == "boolean" else ""
+
+
+class Entity:
+
+    def __init__(self, collection, singular, fields):
+        self.collection = collection
+        self.singular = singular
+        self.fields = {field.name: field for field in fields}
+
+
+ENTITIES = {
+    "todos": Entity("todos", "todo", [Field("title", mandatory=True, not_empty=True), Field("doneStatus", "boolean"),
+                                      Field("description")]),
+    "projects": Entity("projects", "project", [Field("title"), Field("completed", "boolean"), Field("active", "boolean"),
+                                               Field("description")]),
+    "categories": Entity("categories", "category", [Field("title", mandatory=True, not_empty=True), Field("description")]),
+}
+
+# (collection, relationship) -> (target collection, reverse relationship)
+RELATIONSHIPS = {
+    ("todos", "tasksof"): ("projects", "tasks"),
+    ("todos", "categories"): ("categories", "todos"),
+    ("projects", "tasks"): ("todos", "tasksof"),
+    ("projects", "categories"): ("categories", "projects"),
+    ("categories", "todos"): ("todos", "categories"),
+    ("categories", "projects"): ("projects", "categories"),
+}
+# Linking or unlinking one side of these does the other too, the category ones are set one side at a
+# time, but PUT and DELETE of an instance drop every reverse entry that points back at it
+MIRRORED = {("todos", "tasksof"), ("projects", "tasks")}
+
+ALLOWED = {
+    "collection": "OPTIONS, GET, HEAD, POST",
+    "instance": "OPTIONS, GET, HEAD, POST, PUT, DELETE",
+    "relationship": "OPTIONS, GET, HEAD, POST",
+    "relationship instance": "OPTIONS, DELETE",
+}
+
+PARSE_ERROR = "java.lang.IllegalStateException: Expected BEGIN_OBJECT but was STRING at line 1 column 1 path $"
+# What the tests expect from a JVM without helpful NullPointerException messages, tests/stateful.py
+# reduces the jar's "Cannot invoke ... because ... is null" to the same text before comparing
+NULL_POINTER_ERROR = "java.lang.NullPointerException"
+
+
+class ApiError(Exception):
+
+    def __init__(self, status, message, content_type=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.content_type = content_type
+
+
+class Instance:
+
+    def __init__(self, entity, instance_id, fields):
+        self.entity = entity
+        self.id = instance_id
+        self.fields = fields
+        # relationship -> related ids, insertion ordered and never repeated
+        self.relationships = {}
+
+    def related(self, relationship):
+        return self.relationships.setdefault(relationship, [])
+
+
+def java_string(value):
+    # How the jar's JSON reader turns a non-string scalar into a field value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return java_double(float(value))
+    return value
+
+
+def java_double(number):
+    # Double.toString: plain between 10^-3 and 10^7, otherwise d.dddE<n>
+    if number == 0:
+        return repr(number)
+    if 1e-3 <= abs(number) < 1e7:
+        text = repr(number)
+        return text if "." in text else text + ".0"
+    sign, digits, exponent = Decimal(repr(number)).normalize().as_tuple()
+    digits = "".join(map(str, digits))
+    return "%s%s.%sE%d" % ("-" if sign else "", digits[0], digits[1:] or "0", len(digits) - 1 + exponent)
+
+
+_JAVA_DECIMAL = re.compile(r"-?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?[fFdD]?")
+
+
+def xml_value(text):
+    # org.json's XML.stringToValue: the jar reads XML bodies into JSON, typing every value on the way
+    text = text.strip()
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    if text.lower() == "null":
+        return None
+    if text[:1] == "-" or text[:1].isdigit():
+        if "." in text or "e" in text.lower() or text == "-0":
+            # Double.valueOf, whatever isn't finite stays a string
+            if _JAVA_DECIMAL.fullmatch(text):
+                number = float(text.rstrip("fFdD"))
+                if number not in (float("inf"), float("-inf")):
+                    return number
+        elif re.fullmatch(r"-?\d+", text) and str(int(text)) == text and -2 ** 63 <= int(text) < 2 ** 63:
+            # Long.valueOf, and only when it prints back unchanged, so 007 stays a string
+            return int(text)
+    return text
+
+
+def java_hash_order(names):
+    # Iteration order of a java.util.HashMap holding these keys, which is how org.json hands XML fields on
+    capacity = 16
+    while len(names) > capacity * 0.75:
+        capacity *= 2
+
+    def bucket(name):
+        # String.hashCode over UTF-16 code units, spread the way HashMap.hash() does
+        units = name.encode("utf-16-be")
+        code = 0
+        for index in range(0, len(units), 2):
+            code = (31 * code + int.from_bytes(units[index:index + 2], "big")) & 0xFFFFFFFF
+        return (code ^ (code >> 16)) & (capacity - 1)
+
+    return sorted(names, key=bucket)
+
+
+def escape_xml(text):
+    return (text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace("'", "&apos;").replace('"', "&quot;"))
+
+
+def negotiate(accept):
+    # First recognised type wins, nothing or a wildcard means JSON
+    if not accept:
+        return "json"
+    for part in accept.split(","):
+        media = part.split(";")[0].strip().lower()
+        if media == XML_TYPE:
+            return "xml"
+        if media in (JSON_TYPE, "*/*", "application/*"):
+            return "json"
+    return None
+
+
+class TodoManagerModel:
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.instances = {collection: {} for collection in ENTITIES}
+            self.deleted = {collection: {} for collection in ENTITIES}
+            self.next_ids = {collection: 1 for collection in ENTITIES}
+            for collection, fields in (("todos", {"title": "scan paperwork"}), ("todos", {"title": "file paperwork"}),
+                                       ("projects", {"title": "Office Work"}), ("categories", {"title": "Office"}),
+                                       ("categories", {"title": "Home"})):
+                self._add(collection, fields)
+            self._link("projects", "1", "tasks", "1")
+            self._link("projects", "1", "tasks", "2")
+            self._link("todos", "1", "categories", "1")
+
+    def load(self, items, next_ids, deleted=None):
+        # Take over a live server's state: items as GET /todos etc. return them in JSON, next_ids the
+        # id each collection will hand out next, deleted the items dangling links still point at
+        with self.lock:
+            self.instances = {collection: {} for collection in ENTITIES}
+            self.deleted = {collection: {} for collection in ENTITIES}
+            self.next_ids = dict(next_ids)
+            for collection, entries in (deleted or {}).items():
+                for item in entries:
+                    self._load_item(collection, item)
+                    self.deleted[collection][item["id"]] = self.instances[collection].pop(item["id"])
+            for collection, entries in items.items():
+                for item in entries:
+                    self._load_item(collection, item)
+
+    def _load_item(self, collection, item):
+        instance = self._add(collection, item, item["id"])
+        for relationship, related in item.items():
+            if (collection, relationship) in RELATIONSHIPS:
+                # Both sides of tasks/tasksof are listed, no need to mirror them
+                instance.relationships[relationship] = [child["id"] for child in related]
+
+    # State
+
+    def _allocate_id(self, collection):
+        instance_id = str(self.next_ids[collection])
+        self.next_ids[collection] += 1
+        return instance_id
+
+    def _add(self, collection, values, instance_id=None):
+        entity = ENTITIES[collection]
+        instance_id = instance_id or self._allocate_id(collection)
+        fields = {name: values.get(name, field.default) for name, field in entity.fields.items()}
+        instance = self.instances[collection][instance_id] = Instance(entity, instance_id, fields)
+        return instance
+
+    def _link(self, collection, parent_id, relationship, child_id):
+        target, reverse = RELATIONSHIPS[(collection, relationship)]
+        related = self.instances[collection][parent_id].related(relationship)
+        if child_id not in related:
+            related.append(child_id)
+        if (collection, relationship) in MIRRORED:
+            back = self.instances[target][child_id].related(reverse)
+            if parent_id not in back:
+                back.append(parent_id)
+
+    def _unlink(self, collection, parent_id, relationship, child_id, mirrored=True):
+        target, reverse = RELATIONSHIPS[(collection, relationship)]
+        self._related_instance(collection, parent_id).related(relationship).remove(child_id)
+        if mirrored:
+            back = self._related_instance(target, child_id).related(reverse)
+            if parent_id in back:
+                back.remove(parent_id)
+
+    def _clear_relationships(self, instance):
+        for relationship in list(instance.relationships):
+            for child_id in list(instance.relationships[relationship]):
+                self._unlink(instance.entity.collection, instance.id, relationship, child_id)
+
+    def _delete(self, instance):
+        # Links the instance doesn't know about are left dangling and keep serving its last state, e.g.
+        # GET /todos/:id/categories after DELETE /categories/:id, when the category never linked back
+        collection = instance.entity.collection
+        self._clear_relationships(instance)
+        del self.instances[collection][instance.id]
+        self.deleted[collection][instance.id] = instance
+
+    def _related_instance(self, collection, instance_id):
+        return self.instances[collection].get(instance_id) or self.deleted[collection][instance_id]
+
+    # Rendering
+
+    def _item(self, instance):
+        item = {"id": instance.id}
+        item.update(instance.fields)
+        for relationship, related in instance.relationships.items():
+            if related:
+                item[relationship] = [{"id": child_id} for child_id in related]
+        return item
+
+    def _render(self, fmt, root, item=None, items=None):
+        # A single item renders as <todo>..</todo>, a list as <todos><todo>..</todo></todos>
+        if fmt == "json":
+            body = item if items is None else {root: items}
+            return json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+        if items is None:
+            return self._xml_item(root, item)
+        singular = ENTITIES[root].singular
+        return "<%s>%s</%s>" % (root, "".join(self._xml_item(singular, each) for each in items), root)
+
+    def _xml_item(self, tag, item):
+        # The jar's XML goes through org.json as well, so elements come out in HashMap order
+        parts = []
+        for name in java_hash_order(list(item)):
+            value = item[name]
+            if isinstance(value, list):
+                parts.extend("<%s><id>%s</id></%s>" % (name, escape_xml(child["id"]), name) for child in value)
+            elif value == "":
+                parts.append("<%s/>" % name)
+            else:
+                parts.append("<%s>%s</%s>" % (name, escape_xml(value), name))
+        return "<%s>%s</%s>" % (tag, "".join(parts), tag)
+
+    def _error_body(self, fmt, message):
+        if fmt == "xml":
+            return "<errorMessages><errorMessage>%s</errorMessage></errorMessages>" % escape_xml(message)
+        return json.dumps({"errorMessages": [message]}, ensure_ascii=False, separators=(",", ":"))
+
+    # Requests
+
+    def handle(self, method, target, headers=None, body=b""):
+        # -> (status, headers, body bytes) for one request, target is the path plus query string
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        method = method.upper()
+        with self.lock:
+            status, response_headers, text = self._dispatch(method, target, headers, body or b"")
+        if method == "HEAD":
+            text = ""
+        return status, response_headers, text.encode("utf-8")
+
+    def _dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        segments = url.path.strip("/").split("/") if url.path.strip("/") else []
+        if url.path.endswith("/") and url.path != "/":
+            return 404, {"Content-Type": HTML_TYPE}, ""
+        route = self._route(segments)
+        if route is None:
+            return 404, {"Content-Type": HTML_TYPE}, ""
+        if method == "OPTIONS":
+            return 200, {"Allow": ALLOWED[route], "Content-Type": HTML_TYPE}, ""
+        if method not in ALLOWED[route].split(", "):
+            return (404 if route == "relationship instance" else 405), {"Content-Type": HTML_TYPE}, ""
+        fmt = negotiate(headers.get("accept"))
+        if fmt is None:
+            return 406, {"Content-Type": JSON_TYPE}, self._error_body("json", "Unrecognised Accept Type")
+        content_type = JSON_TYPE if fmt == "json" else XML_TYPE
+        try:
+            status, extra_headers, text = getattr(self, "_" + route.replace(" ", "_"))(
+                method, segments, dict(parse_qsl(url.query)), headers, body, fmt)
+        except ApiError as error:
+            return error.status, {"Content-Type": error.content_type or content_type}, self._error_body(fmt, error.message)
+        return status, dict({"Content-Type": content_type}, **extra_headers), text
+
+    def _route(self, segments):
+        if not segments or segments[0] not in ENTITIES:
+            return None
+        if len(segments) == 1:
+            return "collection"
+        if len(segments) == 2:
+            return "relationship" if (segments[0], segments[1]) in RELATIONSHIPS else "instance"
+        if (segments[0], segments[2]) not in RELATIONSHIPS:
+            return None
+        return "relationship" if len(segments) == 3 else "relationship instance" if len(segments) == 4 else None
+
+    def _parse(self, headers, body):
+        # -> {field: value} as JSON would have it, None for an empty body
+        content_type = headers.get("content-type", "").lower()
+        if "x-www-form-urlencoded" in content_type:
+            raise ApiError(415, "Unsupported Content Type - " + headers["content-type"])
+        text = body.decode("utf-8", "replace").strip()
+        if not text:
+            return None
+        if content_type.startswith(XML_TYPE) and text.startswith("<"):
+            try:
+                root = ET.fromstring(text)
+            except ET.ParseError:
+                raise ApiError(400, PARSE_ERROR, HTML_TYPE)
+            if len(root) == 0:
+                raise ApiError(400, NULL_POINTER_ERROR, HTML_TYPE)
+            fields = {child.tag: xml_value(child.text or "") for child in root}
+            return {name: fields[name] for name in java_hash_order(list(fields))}
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            raise ApiError(400, PARSE_ERROR, HTML_TYPE)
+        if isinstance(parsed, list):
+            # An array reads as an object without fields
+            return {}
+        if not isinstance(parsed, dict):
+            raise ApiError(400, PARSE_ERROR, HTML_TYPE)
+        return parsed
+
+    def _values(self, entity, parsed, full):
+        # Validated field values, in the order the jar reports problems: every badly typed field in one
+        # message, then the first unknown or empty field in body order, then missing mandatory ones
+        for name, value in parsed.items():
+            if isinstance(value, dict):
+                raise ApiError(400, "Cannot reference fields on non object fields: " + name)
+        values = {}
+        invalid = []
+        for name, value in parsed.items():
+            if name == "id":
+                # Only reaches here on amend and PUT, where a string id is refused and a number (any XML
+                # id) is dropped without a word
+                if isinstance(value, str):
+                    invalid.append("id should be ID")
+                continue
+            field = entity.fields.get(name)
+            if field is None:
+                continue
+            if isinstance(value, list):
+                if not value:
+                    continue
+                value = value[-1]
+            if field.kind == "boolean":
+                if isinstance(value, bool):
+                    values[name] = java_string(value)
+                else:
+                    invalid.append("%s should be BOOLEAN" % name)
+            elif value is not None:
+                values[name] = java_string(value)
+        if invalid:
+            raise ApiError(400, "Failed Validation: " + ", ".join(invalid))
+        for name in parsed:
+            if name == "id":
+                continue
+            if name not in entity.fields:
+                raise ApiError(400, "Could not find field: " + name)
+            if entity.fields[name].not_empty and values.get(name) == "":
+                raise ApiError(400, "Failed Validation: %s : can not be empty" % name)
+        if full:
+            for name, field in entity.fields.items():
+                if field.mandatory and name not in values:
+                    raise ApiError(400, "%s : field is mandatory" % name)
+        return values
+
+    def _create(self, collection, parsed):
+        parsed = parsed or {}
+        if "id" in parsed:
+            raise ApiError(400, "Invalid Creation: Failed Validation: Not allowed to create with id")
+        # The id is taken before validation, a rejected body still leaves a gap
+        instance_id = self._allocate_id(collection)
+        return self._add(collection, self._values(ENTITIES[collection], parsed, full=True), instance_id)
+
+    def _filter(self, instances, query):
+        for name, value in query.items():
+            if name == "id":
+                instances = [instance for instance in instances if instance.id == value]
+            elif any(name in entity.fields for entity in ENTITIES.values()):
+                instances = [instance for instance in instances if instance.fields.get(name) == value]
+        return instances
+
+    def _collection(self, method, segments, query, headers, body, fmt):
+        collection = segments[0]
+        if method == "POST":
+            instance = self._create(collection, self._parse(headers, body))
+            return 201, {"Location": "%s/%s" % (collection, instance.id)}, self._render(fmt, ENTITIES[collection].singular, self._item(instance))
+        instances = self._filter(list(self.instances[collection].values()), query)
+        return 200, {}, self._render(fmt, collection, items=[self._item(instance) for instance in instances])
+
+    def _instance(self, method, segments, query, headers, body, fmt):
+        collection, instance_id = segments
+        entity = ENTITIES[collection]
+        instance = self.instances[collection].get(instance_id)
+        if method in ("GET", "HEAD"):
+            if instance is None:
+                raise ApiError(404, "Could not find an instance with %s/%s" % (collection, instance_id))
+            return 200, {}, self._render(fmt, collection, items=[self._item(instance)])
+        if method == "DELETE":
+            if instance is None:
+                raise ApiError(404, "Could not find any instances with %s/%s" % (collection, instance_id))
+            self._delete(instance)
+            return 200, {}, ""
+        if method == "PUT":
+            # PUT reads the body before looking for the instance, POST the other way round
+            parsed = self._parse(headers, body) or {}
+            if instance is None:
+                # A PUT to a missing id is a creation attempt, so an existing id in the body clashes
+                if isinstance(parsed.get("id"), str) and parsed["id"] in self.instances[collection]:
+                    raise ApiError(409, "Cannot Create with duplicate values: Failed Validation: Found Existing item with id of "
+                                   + parsed["id"])
+                raise ApiError(404, "Invalid GUID for %s entity %s" % (instance_id, entity.singular))
+        else:
+            if instance is None:
+                raise ApiError(404, "No such %s entity instance with GUID or ID %s found" % (entity.singular, instance_id))
+            parsed = self._parse(headers, body) or {}
+        if method == "PUT":
+            values = self._values(entity, parsed, full=True)
+            # PUT replaces the whole instance, relationships included
+            self._clear_relationships(instance)
+            instance.fields = {name: values.get(name, field.default) for name, field in entity.fields.items()}
+        else:
+            instance.fields.update(self._values(entity, parsed, full=False))
+        return 200, {}, self._render(fmt, entity.singular, self._item(instance))
+
+    def _relationship(self, method, segments, query, headers, body, fmt):
+        # /todos/tasksof has no parent id at all
+        collection, parent_id, relationship = segments if len(segments) == 3 else (segments[0], "", segments[1])
+        target, _ = RELATIONSHIPS[(collection, relationship)]
+        parent = self.instances[collection].get(parent_id)
+        if method in ("GET", "HEAD"):
+            # An unknown parent doesn't 404, it lists the related items of every parent
+            parents = [parent] if parent is not None else list(self.instances[collection].values())
+            children = [self._related_instance(target, child_id) for each in parents for child_id in each.relationships.get(relationship, [])]
+            return 200, {}, self._render(fmt, target, items=[self._item(child) for child in self._filter(children, query)])
+        parsed = self._parse(headers, body)
+        if parent is None:
+            raise ApiError(404, "Could not find parent thing for relationship %s/%s/%s" % (collection, parent_id, relationship))
+        if parsed and "id" in parsed:
+            # A number is looked up as e.g. "1.0", which is why XML bodies never link (test_post_todos_id_tasksof_xml)
+            child_id = java_string(parsed["id"])
+            if child_id not in self.instances[target]:
+                raise ApiError(404, "Could not find thing matching value for id")
+            self._link(collection, parent_id, relationship, child_id)
+            return 201, {}, ""
+        for name in parsed or {}:
+            # Unlike POST /todos, an unknown field fails on the field lookup before an id is taken
+            if name not in ENTITIES[target].fields:
+                raise ApiError(400, NULL_POINTER_ERROR, HTML_TYPE)
+        child = self._create(target, parsed)
+        self._link(collection, parent_id, relationship, child.id)
+        return 201, {"Location": "%s/%s" % (target, child.id)}, self._render(fmt, ENTITIES[target].singular, self._item(child))
+
+    def _relationship_instance(self, method, segments, query, headers, body, fmt):
+        collection, parent_id, relationship, child_id = segments
+        parent = self.instances[collection].get(parent_id)
+        # The child is looked up among the relationship's items first, those of every parent when the
+        # parent is unknown, and only then does the missing parent fail
+        parents = [parent] if parent is not None else list(self.instances[collection].values())
+        if not any(child_id in each.relationships.get(relationship, []) for each in parents):
+            raise ApiError(404, "Could not find any instances with %s" % "/".join(segments))
+        if parent is None:
+            raise ApiError(400, NULL_POINTER_ERROR, HTML_TYPE)
+        self._unlink(collection, parent_id, relationship, child_id, (collection, relationship) in MIRRORED)
+        return 200, {}, ""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as two writes, with Nagle on the second waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.command == "GET" and self.path == "/shutdown":
+            self._send(200, {"Content-Type": HTML_TYPE}, b"")
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        status, headers, content = self.server.model.handle(self.command, self.path, dict(self.headers.items()), body)
+        self._send(status, headers, content)
+
+    def _send(self, status, headers, content):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        # HEAD answers carry no body, so no length either
+        if self.command != "HEAD":
+            self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_DELETE = do_PATCH = do_OPTIONS = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTodoManagerServer:
+    # Same surface as tests.server.TodoManagerServer, backed by a TodoManagerModel in a thread
+
+    def __init__(self, port=0, model=None):
+        self.port = port
+        self.model = model or TodoManagerModel()
+        self.httpd = None
+        self.thread = None
+        self.metrics = {}
+
+    @property
+    def base_url(self):
+        return "http://localhost:%d" % self.port
+
+    def start(self, timeout=None):
+        started = time.perf_counter()
+        self.httpd = ThreadingHTTPServer(("localhost", self.port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.model = self.model
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.metrics["time_to_first_response_seconds"] = time.perf_counter() - started
+        return self
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self, timeout=10):
+        if self.httpd is None:
+            return
+        if self.is_running():
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join(timeout)
+        self.httpd = None
+
+
+# Fake owned by the current test session when TODO_MANAGER_FAKE is set
+session_fake = None
+
+
+def start_session_fake():
+    global session_fake
+    if session_fake is None:
+        session_fake = FakeTodoManagerServer().start()
+    return session_fake
+
+
+def stop_session_fake():
+    global session_fake
+    if session_fake is not None:
+        session_fake.stop()
+        session_fake = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the in-memory todo manager fake")
+    parser.add_argument("--port", type=int, default=4567)
+    args = parser.parse_args(argv)
+    fake = FakeTodoManagerServer(args.port).start()
+    print("todo manager fake running on " + fake.base_url)
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        pass
+    fake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+from tests import client
+from tests import factory
+from tests.base import ApiTestCase
+from tests.reset import reset_state
+
+
+class TestFactory(ApiTestCase):
+
+    def test_create_many_keeps_order(self):
+        todos = factory.create_many("todos", [{"title": "todo %d" % i} for i in range(6)])
+        self.assertEqual([todo["title"] for todo in todos], ["todo %d" % i for i in range(6)])
+        self.assertEqual(len({todo["id"] for todo in todos}), 6)
+        for todo in todos:
+            response = client.get('/todos/' + todo["id"], headers={'Accept': 'application/json'})
+            self.assertEqual(response.json()["todos"][0]["title"], todo["title"])
+
+    def test_build_graph(self):
+        project = factory.build("projects", [{
+            "title": "School Work",
+            "tasks": [{"title": "essay", "categories": [{"title": "urgent"}, {"id": "1"}]}, {"id": "1"}],
+            "categories": [{"id": "2"}],
+        }])[0]
+        essay, todo_1 = project["tasks"]
+        urgent, category_1 = essay["categories"]
+        self.assertEqual(todo_1, {"id": "1"})
+        self.assertEqual(urgent["title"], "urgent")
+
+        response = client.get('/projects/' + project["id"], headers={'Accept': 'application/json'})
+        saved = response.json()["projects"][0]
+        self.assertJsonEqual(saved["tasks"], [{"id": essay["id"]}, {"id": "1"}])
+        self.assertJsonEqual(saved["categories"], [{"id": "2"}])
+        response = client.get('/todos/' + essay["id"], headers={'Accept': 'application/json'})
+        saved = response.json()["todos"][0]
+        self.assertEqual(saved["title"], "essay")
+        self.assertJsonEqual(saved["tasksof"], [{"id": project["id"]}])
+        self.assertJsonEqual(saved["categories"], [{"id": urgent["id"]}, {"id": category_1["id"]}])
+
+    def test_reset_removes_instances_and_links(self):
+        before = client.get('/todos/2', headers={'Accept': 'application/json'}).json()
+        category = factory.build("todos", [{"id": "2", "categories": [{"title": "temporary"}, {"id": "1"}]}])[0]["categories"][0]
+        self.assertEqual(client.get('/categories/' + category["id"]).status_code, 200)
+
+        reset_state()
+        self.assertEqual(client.get('/categories/' + category["id"]).status_code, 404)
+        self.assertJsonEqual(client.get('/todos/2', headers={'Accept': 'application/json'}).json(), before)
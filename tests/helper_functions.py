@@ -1,7 +1,182 @@
+import functools
+import json
+import xml.etree.ElementTree as ET
+
+# XML comparison ignores child order: the server returns collections and relationships in any order.
+# Every element is reduced to a digest built from its tag, text, attributes and the multiset of its
+# children's digests, so comparing two trees is one linear pass over each.
+
+_DIGEST_MASK = (1 << 64) - 1
+
+
+@functools.lru_cache(maxsize=None)
+def parse_fixture(text):
+    # Expected XML from the const modules is parsed once per session. Every caller gets the same tree,
+    # so treat it as read-only.
+    return ET.fromstring(text)
+
+
+def _text(value):
+    # Indentation between elements is whitespace only and doesn't count, any other text counts as is
+    return value if value and not value.isspace() else ""
+
+
+def _node_digest(element, child_digests):
+    # Summing child digests is order-insensitive and keeps duplicates distinct
+    attributes = tuple(sorted(element.attrib.items())) if element.attrib else ()
+    return hash((element.tag, _text(element.text), attributes, sum(child_digests) & _DIGEST_MASK, len(child_digests))) & _DIGEST_MASK
+
+
+def xml_digest(element):
+    return _node_digest(element, [xml_digest(child) for child in element])
+
+
 def elements_equal(e1, e2):
-    if e1.tag != e2.tag: return False
-    if e1.text != e2.text: return False
-    if e1.tail != e2.tail: return False
-    if e1.attrib != e2.attrib: return False
-    if len(e1) != len(e2): return False
-    return all(elements_equal(c1, c2) for c1, c2 in zip(e1, e2))
\ No newline at end of file
+    return xml_digest(e1) == xml_digest(e2)
+
+
+def _element_label(element):
+    id_element = element.find("./id")
+    if id_element is not None and _text(id_element.text):
+        return "%s[id=%s]" % (element.tag, _text(id_element.text))
+    return element.tag
+
+
+def xml_diff(actual, expected, path=None):
+    path = path or actual.tag
+    differences = []
+    if actual.tag != expected.tag:
+        return ["%s: tag %r != %r" % (path, actual.tag, expected.tag)]
+    if _text(actual.text) != _text(expected.text):
+        differences.append("%s: text %r != %r" % (path, _text(actual.text), _text(expected.text)))
+    if actual.attrib != expected.attrib:
+        differences.append("%s: attributes %r != %r" % (path, actual.attrib, expected.attrib))
+
+    # Cancel out identical children by digest, only the leftovers need a closer look
+    unmatched = {}
+    for child in expected:
+        unmatched.setdefault(xml_digest(child), []).append(child)
+    extra = []
+    for child in actual:
+        matches = unmatched.get(xml_digest(child))
+        if matches:
+            matches.pop()
+        else:
+            extra.append(child)
+    missing = {}
+    for children in unmatched.values():
+        for child in children:
+            missing.setdefault(_element_label(child), []).append(child)
+
+    for child in extra:
+        label = _element_label(child)
+        if missing.get(label):
+            differences.extend(xml_diff(child, missing[label].pop(0), path + "/" + label))
+        else:
+            differences.append("%s/%s: unexpected element" % (path, label))
+    for label, children in missing.items():
+        differences.extend("%s/%s: missing element" % (path, label) for _ in children)
+    return differences
+
+
+# JSON comparison treats arrays of objects that all carry an "id" as sets keyed by id, matching how
+# the server returns todos, projects and their relationships in no particular order.
+
+class _IdIndex(dict):
+    # id -> normalized item. Never equal to a plain dict, an id array that came back as an object with
+    # the same keys is a different shape
+
+    def __eq__(self, other):
+        return isinstance(other, _IdIndex) and dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+class _Repeated(list):
+    # Normalized items sharing one id, the fallback routes repeat parents (see test_get_todos_id_tasksof_no_id)
+    pass
+
+
+def _is_id_array(value):
+    return bool(value) and all(isinstance(item, dict) and "id" in item for item in value)
+
+
+def normalize_json(value):
+    if isinstance(value, dict):
+        return {key: normalize_json(item) if isinstance(item, (dict, list)) else item for key, item in value.items()}
+    if isinstance(value, list):
+        if not _is_id_array(value):
+            return [normalize_json(item) if isinstance(item, (dict, list)) else item for item in value]
+        index = _IdIndex()
+        repeated = []
+        for item in value:
+            key = str(item["id"])
+            normalized = normalize_json(item)
+            if key not in index:
+                index[key] = normalized
+            elif isinstance(index[key], _Repeated):
+                index[key].append(normalized)
+            else:
+                index[key] = _Repeated([index[key], normalized])
+                repeated.append(index[key])
+        for items in repeated:
+            items.sort(key=lambda item: json.dumps(item, sort_keys=True))
+        return index
+    return value
+
+
+def json_equal(actual, expected):
+    return normalize_json(actual) == normalize_json(expected)
+
+
+def json_diff(actual, expected):
+    differences = []
+    _json_diff(normalize_json(actual), normalize_json(expected), "", differences)
+    return differences
+
+
+def _json_diff(actual, expected, path, differences):
+    if isinstance(actual, _IdIndex) and isinstance(expected, _IdIndex):
+        for key in expected.keys() - actual.keys():
+            differences.append("%s[id=%s]: missing" % (path, key))
+        for key in actual.keys() - expected.keys():
+            differences.append("%s[id=%s]: unexpected" % (path, key))
+        for key in actual.keys() & expected.keys():
+            actual_item, expected_item = actual[key], expected[key]
+            actual_count = len(actual_item) if isinstance(actual_item, _Repeated) else 1
+            expected_count = len(expected_item) if isinstance(expected_item, _Repeated) else 1
+            if actual_count != expected_count:
+                differences.append("%s[id=%s]: %d occurrences != %d" % (path, key, actual_count, expected_count))
+            elif isinstance(actual_item, _Repeated):
+                for actual_repeat, expected_repeat in zip(actual_item, expected_item):
+                    _json_diff(actual_repeat, expected_repeat, "%s[id=%s]" % (path, key), differences)
+            else:
+                _json_diff(actual_item, expected_item, "%s[id=%s]" % (path, key), differences)
+    elif isinstance(actual, dict) and isinstance(expected, dict) and not isinstance(actual, _IdIndex) and not isinstance(expected, _IdIndex):
+        for key in expected.keys() - actual.keys():
+            differences.append("%s: missing" % _json_path(path, key))
+        for key in actual.keys() - expected.keys():
+            differences.append("%s: unexpected" % _json_path(path, key))
+        for key in actual.keys() & expected.keys():
+            _json_diff(actual[key], expected[key], _json_path(path, key), differences)
+    elif isinstance(actual, list) and isinstance(expected, list):
+        if len(actual) != len(expected):
+            differences.append("%s: %d items != %d" % (path or "$", len(actual), len(expected)))
+        for i, (actual_item, expected_item) in enumerate(zip(actual, expected)):
+            _json_diff(actual_item, expected_item, "%s[%d]" % (path, i), differences)
+    elif actual != expected:
+        differences.append("%s: %s != %s" % (path or "$", _json_preview(actual), _json_preview(expected)))
+
+
+def _json_path(path, key):
+    return key if not path else path + "." + key
+
+
+def _json_preview(value):
+    if isinstance(value, _IdIndex):
+        value = list(value.values())
+    text = json.dumps(value, sort_keys=True)
+    return text if len(text) <= 80 else text[:77] + "..."
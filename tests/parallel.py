@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from tests import trace
+from tests.server import ROOT_DIR, TodoManagerServer
+
+# Usage: python -m tests.parallel -n 4 [pytest paths...]
+
+DURATIONS_PATH = os.path.join(ROOT_DIR, ".test_durations.json")
+DEFAULT_CLASS_SECONDS = 0.5
+
+
+def collect_classes(paths):
+    output = subprocess.run([sys.executable, "-m", "pytest", "-q", "--collect-only"] + paths,
+                            cwd=ROOT_DIR, capture_output=True, text=True).stdout
+    classes = {}
+    for line in output.splitlines():
+        if "::" not in line:
+            continue
+        test_class = line.rsplit("::", 1)[0]
+        classes[test_class] = classes.get(test_class, 0) + 1
+    return classes
+
+
+def load_durations(path=DURATIONS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_durations(durations, path=DURATIONS_PATH):
+    with open(path, "w") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+
+
+def make_shards(classes, durations, count):
+    # Longest processing time first: heaviest class goes to the lightest shard
+    estimate = lambda test_class: durations.get(test_class, DEFAULT_CLASS_SECONDS)
+    shards = [{"classes": [], "seconds": 0.0} for _ in range(count)]
+    for test_class in sorted(classes, key=estimate, reverse=True):
+        shard = min(shards, key=lambda s: s["seconds"])
+        shard["classes"].append(test_class)
+        shard["seconds"] += estimate(test_class)
+    return [shard for shard in shards if shard["classes"]]
+
+
+def class_node_id(classname):
+    module, test_class = classname.rsplit(".", 1)
+    return module.replace(".", "/") + ".py::" + test_class
+
+
+def read_junit(path):
+    results = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "durations": {}, "failed": []}
+    if not os.path.exists(path):
+        return results
+    for testcase in ET.parse(path).getroot().iter("testcase"):
+        node_id = class_node_id(testcase.get("classname"))
+        results["tests"] += 1
+        results["durations"][node_id] = results["durations"].get(node_id, 0.0) + float(testcase.get("time", 0))
+        if testcase.find("failure") is not None:
+            results["failures"] += 1
+            results["failed"].append(node_id + "::" + testcase.get("name"))
+        elif testcase.find("error") is not None:
+            results["errors"] += 1
+            results["failed"].append(node_id + "::" + testcase.get("name"))
+        elif testcase.find("skipped") is not None:
+            results["skipped"] += 1
+    return results
+
+
+def run_shard(index, shard, server, report_dir):
+    junit_path = os.path.join(report_dir, "shard-%d.xml" % index)
+    env = dict(os.environ, TODO_MANAGER_URL=server.base_url)
+    if trace.TRACE_PATH:
+        env["TODO_MANAGER_TRACE"] = shard_trace_path(index)
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                                "--junitxml=" + junit_path] + shard["classes"],
+                               cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    results = read_junit(junit_path)
+    results["seconds"] = time.perf_counter() - started
+    results["returncode"] = completed.returncode
+    results["output"] = completed.stdout + completed.stderr
+    return results
+
+
+def shard_trace_path(index):
+    return "%s.shard-%d" % (trace.TRACE_PATH, index)
+
+
+def merge_traces(count):
+    # Shards trace to their own files, concatenated in shard order once all of them finished
+    with open(trace.TRACE_PATH, "w") as merged:
+        for index in range(count):
+            path = shard_trace_path(index)
+            if os.path.exists(path):
+                with open(path) as f:
+                    merged.write(f.read())
+                os.remove(path)
+
+
+def start_servers(count, base_port):
+    servers = []
+    try:
+        for i in range(count):
+            servers.append(TodoManagerServer(base_port + i).launch())
+        # JVMs boot concurrently, then wait on each one in turn
+        for server in servers:
+            server.wait_until_ready()
+    except BaseException:
+        for server in servers:
+            server.stop()
+        raise
+    return servers
+
+
+def run(workers, paths, base_port=4600):
+    classes = collect_classes(paths)
+    durations = load_durations()
+    shards = make_shards(classes, durations, workers)
+    if not shards:
+        print("no tests collected from " + " ".join(paths))
+        return 1
+    servers = start_servers(len(shards), base_port)
+    report_dir = tempfile.mkdtemp(prefix="todo-manager-shards-")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(len(shards)) as pool:
+            results = list(pool.map(lambda args: run_shard(*args),
+                                    [(i, shard, servers[i], report_dir) for i, shard in enumerate(shards)]))
+    finally:
+        for server in servers:
+            server.stop()
+    elapsed = time.perf_counter() - started
+    if trace.TRACE_PATH:
+        merge_traces(len(shards))
+
+    merged = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "failed": []}
+    for result in results:
+        for key in merged:
+            merged[key] += result[key]
+        durations.update(result["durations"])
+    save_durations(durations)
+
+    # A shard that crashed, failed to collect or wrote no junit report has nothing to merge, so its
+    # pytest exit status decides: 1 with failures in its report is already counted, anything else is broken
+    broken = [i for i, result in enumerate(results)
+              if not result["tests"] or result["returncode"] not in (0, 1)
+              or (result["returncode"] == 1 and not result["failures"] and not result["errors"])]
+    for i, result in enumerate(results):
+        print("shard %d: %d classes, %d tests, %.2fs (port %d)" % (i, len(shards[i]["classes"]), result["tests"], result["seconds"], servers[i].port))
+    for i in broken:
+        print("BROKEN shard %d: pytest exited with %d after %d tests\n%s" % (i, results[i]["returncode"], results[i]["tests"],
+                                                                         results[i]["output"]))
+    for failed in merged["failed"]:
+        print("FAILED " + failed)
+    print("%d tests, %d failures, %d errors, %d skipped in %.2fs across %d servers" % (
+        merged["tests"], merged["failures"], merged["errors"], merged["skipped"], elapsed, len(shards)))
+    return 1 if merged["failures"] or merged["errors"] or broken else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the suite sharded across independent todo manager servers")
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--base-port", type=int, default=4600)
+    parser.add_argument("paths", nargs="*", default=["tests"])
+    args = parser.parse_args(argv)
+    return run(args.workers, args.paths, args.base_port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
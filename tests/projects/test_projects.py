@@ -1,44 +1,51 @@
-import requests
-import subprocess
-import unittest
+from tests import client
+from tests.base import ApiTestCase
+from tests.helper_functions import parse_fixture
+from tests.streaming import stream_items
 import json
 from tests.projects import const
 import xml.etree.ElementTree as ET
-from tests.helper_functions import elements_equal
 
-class TestProjects(unittest.TestCase):
-
-    def setUp(self):
-        self.active_projects = []
-
-    def tearDown(self):
-        for i in self.active_projects:
-            requests.delete('http://localhost:4567/projects/' + i)
+class TestProjects(ApiTestCase):
 
     def test_get_projects_json(self):
-        response = requests.get('http://localhost:4567/projects', headers={'Accept': 'application/json'})
+        response = client.get('/projects', headers={'Accept': 'application/json'})
         project_json = response.json()
         # Compare response with expected json
         self.assertEqual(response.status_code, 200)
-        self.assertIn(project_json, [const.DEFAULT_PROJECT_JSON_V1, const.DEFAULT_PROJECT_JSON_V2])
+        self.assertJsonEqual(project_json, const.DEFAULT_PROJECT_JSON)
 
     def test_get_projects_xml(self):
-        response = requests.get('http://localhost:4567/projects', headers={'Accept': 'application/xml'})
+        response = client.get('/projects', headers={'Accept': 'application/xml'})
         # Compare response with expected xml
         project_xml = ET.fromstring(response.content)
-        expected_project_xml_v1 = ET.fromstring(const.DEFAULT_PROJECT_XML_V1)
-        expected_project_xml_v2 = ET.fromstring(const.DEFAULT_PROJECT_XML_V2)
-        self.assertTrue(elements_equal(project_xml, expected_project_xml_v1) or elements_equal(project_xml, expected_project_xml_v2))
+        expected_project_xml = parse_fixture(const.DEFAULT_PROJECT_XML)
+        self.assertElementsEqual(project_xml, expected_project_xml)
         self.assertEqual(response.status_code, 200)
 
+    def test_get_projects_json_streaming(self):
+        # Validate each project as it arrives instead of loading the whole collection
+        expected_projects = {project["id"]: project for project in const.DEFAULT_PROJECT_JSON["projects"]}
+        for project in stream_items('/projects', 'project', 'json'):
+            self.assertIn(project["id"], expected_projects)
+            self.assertJsonEqual(project, expected_projects.pop(project["id"]))
+        self.assertEqual(expected_projects, {})
+
+    def test_get_projects_xml_streaming(self):
+        expected_projects = {project.find("./id").text: project for project in parse_fixture(const.DEFAULT_PROJECT_XML)}
+        for project in stream_items('/projects', 'project', 'xml'):
+            self.assertIn(project.find("./id").text, expected_projects)
+            self.assertElementsEqual(project, expected_projects.pop(project.find("./id").text))
+        self.assertEqual(expected_projects, {})
+
     def test_head_projects_json(self):
-        response = requests.head('http://localhost:4567/projects', headers={'Accept': 'application/json'})
+        response = client.head('/projects', headers={'Accept': 'application/json'})
         # Check if Content-Type in header is application/json
         self.assertEqual(response.headers['Content-Type'], 'application/json')
         self.assertEqual(response.status_code, 200)
 
     def test_head_projects_xml(self):
-        response = requests.head('http://localhost:4567/projects', headers={'Accept': 'application/xml'})
+        response = client.head('/projects', headers={'Accept': 'application/xml'})
         # Check if Content-Type in header is application/xml
         self.assertEqual(response.headers['Content-Type'], 'application/xml')
         self.assertEqual(response.status_code, 200)
@@ -50,18 +57,17 @@ class TestProjects(unittest.TestCase):
             "active": False,
             "description": "Work on assignments."
         }
-        response = requests.post('http://localhost:4567/projects', json = project_data, headers={'Accept': 'application/json'})
+        response = client.post('/projects', json = project_data, headers={'Accept': 'application/json'})
         self.assertEqual(response.status_code, 201)
         project_json = response.json()
         # Check if what was created matches what was provided
         self.assertIn("id", project_json)
-        self.active_projects.append(project_json["id"])
         self.assertEqual(project_json["title"], project_data["title"])
         self.assertEqual(project_json["completed"], json.dumps(project_data["completed"]))
         self.assertEqual(project_json["active"], json.dumps(project_data["active"]))
         self.assertEqual(project_json["description"], project_data["description"])
 
-        response = requests.get('http://localhost:4567/projects/' + project_json['id'], headers={'Accept': 'application/json'})
+        response = client.get('/projects/' + project_json['id'], headers={'Accept': 'application/json'})
         obtained_project = response.json()['projects'][0]
         # Check if created project matches what we have
         self.assertEqual(response.status_code, 200)
@@ -74,21 +80,20 @@ class TestProjects(unittest.TestCase):
             "active": False,
             "description": "Work on assignments."
         }
-        response = requests.post('http://localhost:4567/projects', json = project_data, headers={'Accept': 'application/xml'})
+        response = client.post('/projects', json = project_data, headers={'Accept': 'application/xml'})
         self.assertEqual(response.status_code, 201)
         project_xml = ET.fromstring(response.content)
-        self.active_projects.append(project_xml.find("./id").text)
         # Check if what was created matches what was provided
         self.assertEqual(project_xml.find("./title").text, project_data["title"])
         self.assertEqual(project_xml.find("./completed").text, str(project_data["completed"]).lower())
         self.assertEqual(project_xml.find("./active").text, str(project_data["active"]).lower())
         self.assertEqual(project_xml.find("./description").text, project_data["description"])
 
-        response = requests.get('http://localhost:4567/projects/' + project_xml.find("./id").text, headers={'Accept': 'application/xml'})
+        response = client.get('/projects/' + project_xml.find("./id").text, headers={'Accept': 'application/xml'})
         obtained_project = ET.fromstring(response.content)[0]
         # Check if created project matches what we have
         self.assertEqual(response.status_code, 200)
-        self.assertTrue(elements_equal(project_xml, obtained_project))
+        self.assertElementsEqual(project_xml, obtained_project)
 
     def test_create_project_wrong_field_json(self):
         project_data = {
@@ -97,7 +102,7 @@ class TestProjects(unittest.TestCase):
             "active": False,
             "description": "Work on assignments."
         }
-        response = requests.post('http://localhost:4567/projects', json = project_data, headers={'Accept': 'application/json'})
+        response = client.post('/projects', json = project_data, headers={'Accept': 'application/json'})
         self.assertEqual(response.status_code, 400)
         error_json = response.json()
         # Check if error message is returned
@@ -110,7 +115,7 @@ class TestProjects(unittest.TestCase):
             "active": False,
             "description": "Work on assignments."
         }
-        response = requests.post('http://localhost:4567/projects', json = project_data, headers={'Accept': 'application/xml'})
+        response = client.post('/projects', json = project_data, headers={'Accept': 'application/xml'})
         self.assertEqual(response.status_code, 400)
         error_xml = ET.fromstring(response.content)
         # Check if error message is returned
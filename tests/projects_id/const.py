@@ -1,4 +1,4 @@
-DEFAULT_PROJECT_JSON_V1 = {
+DEFAULT_PROJECT_JSON = {
     "projects": [
         {
             "id": "1",
@@ -18,26 +18,4 @@ DEFAULT_PROJECT_JSON_V1 = {
     ]
 }
 
-DEFAULT_PROJECT_JSON_V2 = {
-    "projects": [
-        {
-            "id": "1",
-            "title": "Office Work",
-            "completed": "false",
-            "active": "false",
-            "description": "",
-            "tasks": [
-                {
-                    "id": "2"
-                },
-                {
-                    "id": "1"
-                }
-            ]
-        }
-    ]
-}
-
-DEFAULT_PROJECT_XML_V1 = "<projects><project><active>false</active><description/><id>1</id><completed>false</completed><title>Office Work</title><tasks><id>1</id></tasks><tasks><id>2</id></tasks></project></projects>"
-
-DEFAULT_PROJECT_XML_V2 = "<projects><project><active>false</active><description/><id>1</id><completed>false</completed><title>Office Work</title><tasks><id>2</id></tasks><tasks><id>1</id></tasks></project></projects>"
\ No newline at end of file
+DEFAULT_PROJECT_XML = "<projects><project><active>false</active><description/><id>1</id><completed>false</completed><title>Office Work</title><tasks><id>1</id></tasks><tasks><id>2</id></tasks></project></projects>"
\ No newline at end of file
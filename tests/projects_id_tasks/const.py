@@ -1,4 +1,4 @@
-TODOS_DEFAULT_JSON_V1 = {
+TODOS_DEFAULT_JSON = {
     "todos": [
         {
             "id": "2",
@@ -30,38 +30,4 @@ TODOS_DEFAULT_JSON_V1 = {
     ]
 }
 
-TODOS_DEFAULT_JSON_V2 = {
-    "todos": [
-        {
-            "id": "1",
-            "title": "scan paperwork",
-            "doneStatus": "false",
-            "description": "",
-            "tasksof": [
-                {
-                    "id": "1"
-                }
-            ],
-            "categories": [
-                {
-                    "id": "1"
-                }
-            ]
-        },
-        {
-            "id": "2",
-            "title": "file paperwork",
-            "doneStatus": "false",
-            "description": "",
-            "tasksof": [
-                {
-                    "id": "1"
-                }
-            ]
-        }
-    ]
-}
-
-TODOS_DEFAULT_XML_V1 = "<todos><todo><doneStatus>false</doneStatus><description/><tasksof><id>1</id></tasksof><id>2</id><title>file paperwork</title></todo><todo><doneStatus>false</doneStatus><description/><tasksof><id>1</id></tasksof><id>1</id><categories><id>1</id></categories><title>scan paperwork</title></todo></todos>"
-
-TODOS_DEFAULT_XML_V2 = "<todos><todo><doneStatus>false</doneStatus><description/><tasksof><id>1</id></tasksof><id>1</id><categories><id>1</id></categories><title>scan paperwork</title></todo><todo><doneStatus>false</doneStatus><description/><tasksof><id>1</id></tasksof><id>2</id><title>file paperwork</title></todo></todos>"
\ No newline at end of file
+TODOS_DEFAULT_XML = "<todos><todo><doneStatus>false</doneStatus><description/><tasksof><id>1</id></tasksof><id>2</id><title>file paperwork</title></todo><todo><doneStatus>false</doneStatus><description/><tasksof><id>1</id></tasksof><id>1</id><categories><id>1</id></categories><title>scan paperwork</title></todo></todos>"
\ No newline at end of file
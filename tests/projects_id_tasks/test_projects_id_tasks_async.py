@@ -0,0 +1,84 @@
+import asyncio
+import os
+import unittest
+from tests.base import AsyncApiTestCase
+
+TASK_COUNT = 100
+# The race probe is out of the default run, it fails only when the race triggers
+RACE_ROUNDS = int(os.environ.get("TODO_MANAGER_RACE_ROUNDS", "0"))
+
+class TestProjectsIdTasksAsync(AsyncApiTestCase):
+
+    async def create_linked_project(self, count):
+        response = await self.client.create_project("School Work", description="Work on assignments.")
+        project_id = response.json()["id"]
+        responses = await asyncio.gather(*[self.client.create_todo("Task %d" % i) for i in range(count)])
+        todo_ids = [response.json()["id"] for response in responses]
+        responses = await asyncio.gather(*[self.client.link_project_task(project_id, todo_id) for todo_id in todo_ids])
+        return project_id, todo_ids, responses
+
+    async def create_sequentially_linked_project(self, count):
+        response = await self.client.create_project("School Work", description="Work on assignments.")
+        project_id = response.json()["id"]
+        responses = await asyncio.gather(*[self.client.create_todo("Task %d" % i) for i in range(count)])
+        todo_ids = [response.json()["id"] for response in responses]
+        for todo_id in todo_ids:
+            response = await self.client.link_project_task(project_id, todo_id)
+            self.assertEqual(response.status_code, 201)
+        return project_id, todo_ids
+
+    async def test_post_projects_id_tasks_concurrent_json(self):
+        # Create one project and one todo per pair, all at once
+        project_responses, todo_responses = await asyncio.gather(
+            asyncio.gather(*[self.client.create_project("Project %d" % i) for i in range(TASK_COUNT)]),
+            asyncio.gather(*[self.client.create_todo("Task %d" % i) for i in range(TASK_COUNT)]))
+        self.assertEqual([response.status_code for response in project_responses + todo_responses], [201] * TASK_COUNT * 2)
+        project_ids = [response.json()["id"] for response in project_responses]
+        todo_ids = [response.json()["id"] for response in todo_responses]
+        self.assertEqual(len(set(todo_ids)), TASK_COUNT)
+
+        # Link every pair concurrently
+        responses = await asyncio.gather(*[self.client.link_project_task(project_id, todo_id)
+                                           for project_id, todo_id in zip(project_ids, todo_ids)])
+        self.assertEqual([response.status_code for response in responses], [201] * TASK_COUNT)
+
+        # Verify the relationship from both sides
+        responses = await asyncio.gather(*[self.client.get_project_tasks(project_id) for project_id in project_ids])
+        self.assertEqual([[todo["id"] for todo in response.json()["todos"]] for response in responses], [[todo_id] for todo_id in todo_ids])
+        responses = await asyncio.gather(*[self.client.get_todo_tasksof(todo_id) for todo_id in todo_ids])
+        self.assertEqual([[project["id"] for project in response.json()["projects"]] for response in responses], [[project_id] for project_id in project_ids])
+
+    async def test_delete_projects_id_tasks_concurrent_json(self):
+        # Linked one at a time, concurrent links race too
+        project_id, todo_ids = await self.create_sequentially_linked_project(TASK_COUNT)
+
+        # Unlink every task at once. The server races on the shared task list, so besides 200 a few answer
+        # 400 with "java.util.ConcurrentModificationException" or 404 for a task still linked, and what
+        # those leave linked varies, see the race probe below
+        responses = await asyncio.gather(*[self.client.unlink_project_task(project_id, todo_id) for todo_id in todo_ids])
+        statuses = [response.status_code for response in responses]
+        self.assertEqual(statuses.count(200) + statuses.count(400) + statuses.count(404), TASK_COUNT)
+        self.assertIn(200, statuses)
+
+        # Every unlink that answered 200 took, seen from the todo's side
+        unlinked = [todo_id for todo_id, status in zip(todo_ids, statuses) if status == 200]
+        responses = await asyncio.gather(*[self.client.get_todo_tasksof(todo_id) for todo_id in unlinked])
+        self.assertEqual([response.status_code for response in responses], [200] * len(unlinked))
+        self.assertEqual([todo_id for todo_id, response in zip(unlinked, responses)
+                          if project_id in [project["id"] for project in response.json()["projects"]]], [])
+
+    @unittest.skipUnless(RACE_ROUNDS, "set TODO_MANAGER_RACE_ROUNDS to probe the concurrent unlink race")
+    @unittest.expectedFailure
+    async def test_delete_projects_id_tasks_race_json(self):
+        # ERROR: Concurrent links and unlinks on one project race inside the server, some answer 400 with
+        # "java.util.ConcurrentModificationException" or 404 for a task that is still linked, and reading
+        # the tasks afterwards can fail with a NullPointerException from the corrupted list.
+        # The race does not trigger every time, so retry a few rounds before calling it clean
+        for _ in range(RACE_ROUNDS):
+            project_id, todo_ids, responses = await self.create_linked_project(TASK_COUNT)
+            self.assertEqual([response.status_code for response in responses], [201] * TASK_COUNT)
+            responses = await asyncio.gather(*[self.client.unlink_project_task(project_id, todo_id) for todo_id in todo_ids])
+            self.assertEqual([response.status_code for response in responses], [200] * TASK_COUNT)
+            response = await self.client.get_project_tasks(project_id)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["todos"], [])
@@ -0,0 +1,166 @@
+import os
+import threading
+import warnings
+from tests import client
+from tests.fake_server import FakeTodoManagerServer
+from tests.server import TodoManagerServer, free_port
+
+# TODO_MANAGER_RESET picks how tests get back to the seeded dataset:
+#   auto   - the cheapest reset the server allows (default): model for the in-process fake, swap with a
+#            delete shortcut for a jar the session launched, delete for a server someone else started
+#   model  - reset the in-process fake's data and id counters in place, constant cost
+#   swap   - switch to a pre-warmed spare server, constant cost and a true baseline including
+#            id counters, but every spare is a JVM boot so it needs spare cores to keep up
+#   delete - one DELETE per object created since the last reset, so the cost grows with what the test
+#            made (the async stress tests leave hundreds), and edits or link changes of seeded objects
+#            stay behind, with a warning. It's the only reset that works against a server the session
+#            didn't start. Auto takes it as a shortcut when the test did nothing but create, below
+#            SWAP_THRESHOLD objects or while no spare has finished booting
+#   none   - leave state behind
+# Every mode but none also resets once more when the session ends, so no test leaves objects behind.
+RESET_MODE = os.environ.get("TODO_MANAGER_RESET", "auto")
+SPARE_SERVERS = int(os.environ.get("TODO_MANAGER_SPARES", "1"))
+# Fewer created objects than this are cheaper to delete than to swap for, even with a spare ready
+SWAP_THRESHOLD = int(os.environ.get("TODO_MANAGER_SWAP_THRESHOLD", "20"))
+# Changes a delete reset names when it warns about leaving them behind
+CHANGES_SHOWN = 5
+
+
+def delete_created():
+    for location in reversed(client.created_locations()):
+        client.delete(location)
+
+
+class SwapReset:
+    # POST /admin/data/thingifier only clears data and id counters keep counting,
+    # so the seeded ids 1/2 can only come back with a fresh JVM
+
+    def __init__(self, active, spares=SPARE_SERVERS, threshold=0):
+        self.active = active
+        # With a threshold, resets after nothing but creations delete instead when they're small or
+        # would have to wait for a spare
+        self.threshold = threshold
+        self.spares = [self._launch_spare() for _ in range(max(spares, 1))]
+        self.retiring = []
+        self.swaps = 0
+        self.deletes = 0
+
+    def _launch_spare(self):
+        return TodoManagerServer(free_port(), self.active.model, self.active.jar).launch()
+
+    def _spare_ready(self):
+        # Not probed over HTTP: a cold JVM can take longer to answer its first request than a reset takes
+        return self.spares[0].is_running() and self.spares[0].has_booted()
+
+    def reset(self):
+        if (self.threshold and not client.changed_paths()
+                and (len(client.created_locations()) < self.threshold or not self._spare_ready())):
+            delete_created()
+            self.deletes += 1
+            return
+        spare = self.spares.pop(0)
+        spare.wait_until_ready()
+        retired, self.active = self.active, spare
+        client.set_base_url(spare.base_url)
+        self.spares.append(self._launch_spare())
+        # Shutting down is not on the critical path
+        retiring = threading.Thread(target=retired.stop, daemon=True)
+        retiring.start()
+        self.retiring.append(retiring)
+        self.swaps += 1
+
+    def close(self):
+        for spare in self.spares:
+            spare.stop()
+        self.spares = []
+        self.active.stop()
+        # A daemon thread dies with the interpreter, don't let a retired JVM outlive the session
+        for retiring in self.retiring:
+            retiring.join()
+
+
+class ModelReset:
+    # The fake's data lives in this process, resetting it is one call whatever the tests created
+
+    def __init__(self, fake):
+        self.fake = fake
+
+    def reset(self):
+        self.fake.model.reset()
+        # Nothing went over HTTP, so the response cache never saw a mutation
+        client.clear_cache()
+
+    def close(self):
+        pass
+
+
+class DeleteReset:
+    # Only undoes creations: edits and relationship changes of seeded objects are left behind
+
+    def reset(self):
+        changed = client.changed_paths()
+        if changed:
+            warnings.warn("delete reset leaves %d change(s) to objects it didn't create behind: %s%s" % (
+                len(changed), ", ".join(changed[:CHANGES_SHOWN]), ", ..." if len(changed) > CHANGES_SHOWN else ""))
+        delete_created()
+
+    def close(self):
+        # The server outlives the session, don't leave the last test's objects on it
+        if client.is_dirty():
+            self.reset()
+            client.mark_clean()
+
+
+class NoReset:
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_strategy = None
+
+
+def configure(session_server=None, mode=RESET_MODE):
+    # session_server: the jar or fake this session started, None for a server started by someone else
+    global _strategy
+    if mode == "auto":
+        if isinstance(session_server, FakeTodoManagerServer):
+            mode = "model"
+        elif session_server is not None:
+            _strategy = SwapReset(session_server, threshold=SWAP_THRESHOLD)
+            return _strategy
+        else:
+            mode = "delete"
+    if mode == "swap":
+        if not isinstance(session_server, TodoManagerServer):
+            raise ValueError("swap reset needs a jar launched by the test session")
+        _strategy = SwapReset(session_server)
+    elif mode == "model":
+        if not isinstance(session_server, FakeTodoManagerServer):
+            raise ValueError("model reset needs the in-process fake")
+        _strategy = ModelReset(session_server)
+    elif mode == "delete":
+        _strategy = DeleteReset()
+    elif mode == "none":
+        _strategy = NoReset()
+    else:
+        raise ValueError("unknown reset mode: %s" % mode)
+    return _strategy
+
+
+def reset_state():
+    if _strategy is None:
+        configure()
+    if client.is_dirty():
+        _strategy.reset()
+    client.mark_clean()
+
+
+def close():
+    global _strategy
+    if _strategy is not None:
+        _strategy.close()
+        _strategy = None
@@ -0,0 +1,142 @@
+import os
+import socket
+import subprocess
+import tempfile
+import time
+from urllib.parse import urlparse
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JAR_PATH = os.environ.get("TODO_MANAGER_JAR", os.path.join(ROOT_DIR, "runTodoManagerRestAPI-1.5.5.jar"))
+JAVA = os.environ.get("TODO_MANAGER_JAVA", "java")
+DEFAULT_MODEL = os.environ.get("TODO_MANAGER_MODEL", "todoManager")
+
+
+class ServerStartError(Exception):
+    pass
+
+
+class TodoManagerServer:
+
+    def __init__(self, port=4567, model=DEFAULT_MODEL, jar=JAR_PATH, extra_args=()):
+        self.port = port
+        self.model = model
+        self.jar = jar
+        self.extra_args = list(extra_args)
+        self.process = None
+        self.log_path = None
+        self.metrics = {}
+
+    @property
+    def base_url(self):
+        return "http://localhost:%d" % self.port
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def start(self, timeout=60):
+        self.launch()
+        self.wait_until_ready(timeout)
+        return self
+
+    def launch(self):
+        command = [JAVA, "-jar", self.jar, "-port=%d" % self.port, "-model=%s" % self.model] + self.extra_args
+        # Server echoes every response to stdout, keep it out of a pipe so it can never block
+        log = tempfile.NamedTemporaryFile(prefix="todo-manager-%d-" % self.port, suffix=".log", delete=False)
+        self.log_path = log.name
+        self.launched_at = time.perf_counter()
+        self.process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, cwd=ROOT_DIR)
+        log.close()
+        self.metrics["spawn_seconds"] = time.perf_counter() - self.launched_at
+        return self
+
+    def _log_contains(self, text):
+        with open(self.log_path, errors="replace") as log:
+            return text in log.read()
+
+    def has_booted(self):
+        # Spark logs this once the JVM has booted and bound the port
+        return self._log_contains("Running on")
+
+    def wait_until_ready(self, timeout=60, initial_delay=0.01, max_delay=0.5):
+        deadline = self.launched_at + timeout
+        delay = initial_delay
+        attempts = 0
+        while True:
+            attempts += 1
+            if "jvm_start_seconds" not in self.metrics and self.has_booted():
+                self.metrics["jvm_start_seconds"] = time.perf_counter() - self.launched_at
+            if self.process.poll() is not None:
+                raise ServerStartError("todo manager exited with code %s, see %s" % (self.process.returncode, self.log_path))
+            try:
+                response = requests.get(self.base_url + "/todos", headers={'Accept': 'application/json'}, timeout=max_delay)
+                if response.status_code == 200:
+                    break
+            except requests.ConnectionError:
+                pass
+            except requests.Timeout:
+                pass
+            if time.perf_counter() + delay > deadline:
+                self.stop()
+                raise ServerStartError("todo manager on port %d not ready after %ss" % (self.port, timeout))
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+        self.metrics["time_to_first_response_seconds"] = time.perf_counter() - self.launched_at
+        self.metrics.setdefault("jvm_start_seconds", self.metrics["time_to_first_response_seconds"])
+        self.metrics["readiness_probes"] = attempts
+        return self
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self, timeout=10):
+        if not self.is_running():
+            return
+        started = time.perf_counter()
+        try:
+            requests.get(self.base_url + "/shutdown", timeout=timeout)
+        except requests.RequestException:
+            # The JVM exits mid-request so the connection is usually dropped
+            pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.metrics["shutdown_seconds"] = time.perf_counter() - started
+
+
+def is_reachable(base_url, timeout=0.5):
+    try:
+        return requests.get(base_url + "/todos", headers={'Accept': 'application/json'}, timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def port_of(base_url):
+    return urlparse(base_url).port or 80
+
+
+# Server owned by the current test session, if the suite had to launch one
+session_server = None
+
+
+def start_session_server(base_url, model=DEFAULT_MODEL):
+    global session_server
+    if session_server is None and not is_reachable(base_url):
+        session_server = TodoManagerServer(port_of(base_url), model).start()
+    return session_server
+
+
+def stop_session_server():
+    global session_server
+    if session_server is not None:
+        session_server.stop()
+        session_server = None
@@ -0,0 +1,27 @@
+import os
+import random
+from tests import cassette
+from tests import client
+from tests import stateful
+from tests.base import ApiTestCase
+
+# Longer searches: TODO_MANAGER_STATEFUL_RUNS=50 TODO_MANAGER_STATEFUL_OPS=2000, or python -m tests.stateful
+RUNS = int(os.environ.get("TODO_MANAGER_STATEFUL_RUNS", "2"))
+OPERATIONS = int(os.environ.get("TODO_MANAGER_STATEFUL_OPS", "200"))
+
+
+class TestStateMachine(ApiTestCase):
+
+    def setUp(self):
+        if cassette.replaying():
+            self.skipTest("random operation sequences need a live server")
+        super().setUp()
+
+    def test_random_operations_match_model(self):
+        session = stateful.new_session()
+        for seed in range(RUNS):
+            operations = stateful.generate(random.Random(seed), OPERATIONS)
+            failure = stateful.check(session, client.BASE_URL, operations)[0]
+            if failure is not None:
+                failure = stateful.shrink(session, client.BASE_URL, operations, failure)[1]
+                self.fail("seed %d: %s" % (seed, stateful.describe(failure)))
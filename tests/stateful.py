@@ -0,0 +1,325 @@
+import argparse
+import json
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+from tests import client
+from tests.cassette import bodies_equal
+from tests.fake_server import ENTITIES, RELATIONSHIPS, TodoManagerModel, escape_xml
+from tests.server import TodoManagerServer, free_port
+
+# Usage: python -m tests.stateful [--runs 20] [--ops 1000] [--seed 0] [--servers 4] [--url URL]
+#
+# Random sequences of create/amend/put/delete/link/unlink/read operations over todos, projects and
+# categories, sent to a live server over one pooled connection and checked response by response
+# against TodoManagerModel (tests/fake_server.py). The model is loaded from the server's state when a
+# run starts, and a run only changes objects it created itself, so it can share a server with the
+# suite. A failing run is shrunk by replaying ever shorter subsequences of its operations until none
+# can be dropped, then reported as the requests that reproduce it.
+#
+# The jar serves a few hundred requests a second per core, so the rate comes from running several
+# servers side by side: --servers N starts N jars and runs N sequences at once.
+
+# Operations are generated without looking at server state, targets are fractions that pick one of
+# the objects the run owns when the operation runs, None picks an id that never exists
+Operation = namedtuple("Operation", "kind collection relationship target child fields accept body_format")
+
+WEIGHTS = {
+    "create": 20,
+    "amend": 10,
+    "replace": 5,
+    "delete": 6,
+    "read": 10,
+    "list": 3,
+    "link": 14,
+    "create_related": 6,
+    "unlink": 8,
+    "read_related": 8,
+}
+
+MISSING_ID = "0"
+WORDS = ("paperwork", "", "a & b", "<tag>", "café", "file it", "5")
+
+Failure = namedtuple("Failure", "index operation requests differences")
+
+# Once the JIT compiles a path that keeps throwing the same NullPointerException it throws one without
+# a message, so the jar's helpful 'Cannot invoke ... because ... is null' turns bare after a while
+_NULL_POINTER = re.compile(r'Cannot invoke (\\"|&quot;).*?(\\"|&quot;) because (\\"|&quot;).*?(\\"|&quot;) is null')
+
+
+def without_null_pointer_detail(body):
+    return _NULL_POINTER.sub("java.lang.NullPointerException", body)
+
+
+def random_value(rng, field):
+    if field.kind == "boolean":
+        return rng.choice((True, False, True, False, "true", "maybe"))
+    return rng.choice(WORDS + (7, 0.5))
+
+
+def random_fields(rng, collection):
+    fields = {name: random_value(rng, field) for name, field in ENTITIES[collection].fields.items() if rng.random() < 0.6}
+    roll = rng.random()
+    if roll < 0.04:
+        fields["unknown"] = "x"
+    elif roll < 0.07:
+        fields["id"] = "1"
+    return fields
+
+
+def pick(rng):
+    return None if rng.random() < 0.05 else rng.random()
+
+
+def generate(rng, count):
+    kinds, weights = zip(*WEIGHTS.items())
+    operations = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        collection = rng.choice(sorted(ENTITIES))
+        relationship = rng.choice([name for parent, name in sorted(RELATIONSHIPS) if parent == collection])
+        target = collection
+        if kind == "create_related":
+            target = RELATIONSHIPS[(collection, relationship)][0]
+        fields = random_fields(rng, target) if kind in ("create", "amend", "replace", "create_related") else None
+        # XML bodies naming an id never link anything, keep them rare so links mostly happen
+        body_format = "xml" if rng.random() < (0.05 if kind == "link" else 0.3) else "json"
+        operations.append(Operation(kind, collection, relationship, pick(rng), pick(rng), fields,
+                                    rng.choice(("application/json", "application/xml")), body_format))
+    return operations
+
+
+def encode(fields, body_format, tag):
+    if fields is None:
+        return None
+    if body_format == "json":
+        return json.dumps(fields)
+    values = ("true" if value is True else "false" if value is False else escape_xml(str(value)) for value in fields.values())
+    return "<%s>%s</%s>" % (tag, "".join("<%s>%s</%s>" % (name, value, name) for name, value in zip(fields, values)), tag)
+
+
+class Run:
+    # One sequence against one server, the model follows every request
+
+    def __init__(self, session, base_url):
+        self.session = session
+        self.base_url = base_url
+        self.model = TodoManagerModel()
+        self.created = []
+        self.requests = []
+
+    def sync(self):
+        headers = {"Accept": "application/json", "Content-Type": "application/json"}
+        items = {collection: self.session.get(self.base_url + "/" + collection, headers=headers).json()[collection]
+                 for collection in ENTITIES}
+        deleted = {collection: {} for collection in ENTITIES}
+        for (collection, relationship), (target, _) in RELATIONSHIPS.items():
+            live = {item["id"] for item in items[target]}
+            for item in items[collection]:
+                if any(child["id"] not in live for child in item.get(relationship, [])):
+                    # Deleted objects are only reachable through the links left pointing at them
+                    path = "/%s/%s/%s" % (collection, item["id"], relationship)
+                    for child in self.session.get(self.base_url + path, headers=headers).json()[target]:
+                        if child["id"] not in live:
+                            deleted[target][child["id"]] = child
+        next_ids = {}
+        for collection in ENTITIES:
+            # Ids are only visible once handed out, take one and give the object back
+            response = self.session.post(self.base_url + "/" + collection, data='{"title": "sync"}', headers=headers)
+            instance_id = response.json()["id"]
+            self.session.delete(self.base_url + "/%s/%s" % (collection, instance_id), headers=headers)
+            next_ids[collection] = int(instance_id) + 1
+        self.model.load(items, next_ids, {collection: list(found.values()) for collection, found in deleted.items()})
+
+    def owned(self, collection):
+        instances = self.model.instances[collection]
+        return [instance_id for owner, instance_id in self.created if owner == collection and instance_id in instances]
+
+    def choose(self, collection, fraction):
+        candidates = self.owned(collection)
+        if fraction is None or not candidates:
+            return MISSING_ID
+        return candidates[int(fraction * len(candidates))]
+
+    def resolve(self, operation):
+        # -> method, path, body
+        kind, collection, relationship = operation.kind, operation.collection, operation.relationship
+        target = self.choose(collection, operation.target)
+        singular = ENTITIES[collection].singular
+        if kind == "create":
+            return "POST", "/" + collection, encode(operation.fields, operation.body_format, singular)
+        if kind == "amend":
+            return "POST", "/%s/%s" % (collection, target), encode(operation.fields, operation.body_format, singular)
+        if kind == "replace":
+            return "PUT", "/%s/%s" % (collection, target), encode(operation.fields, operation.body_format, singular)
+        if kind == "delete":
+            return "DELETE", "/%s/%s" % (collection, target), None
+        if kind == "read":
+            # The child pick is unused here, it doubles as the GET or HEAD coin
+            return ("HEAD" if operation.child is None else "GET"), "/%s/%s" % (collection, target), None
+        if kind == "list":
+            instance = self.model.instances[collection].get(target)
+            query = "?title=" + instance.fields["title"] if instance is not None and instance.fields["title"].isalnum() else ""
+            return "GET", "/" + collection + query, None
+        child_collection = RELATIONSHIPS[(collection, relationship)][0]
+        path = "/%s/%s/%s" % (collection, target, relationship)
+        if kind == "link":
+            child = self.choose(child_collection, operation.child)
+            return "POST", path, encode({"id": child}, operation.body_format, ENTITIES[child_collection].singular)
+        if kind == "create_related":
+            return "POST", path, encode(operation.fields, operation.body_format, ENTITIES[child_collection].singular)
+        if kind == "unlink":
+            parent = self.model.instances[collection].get(target)
+            related = parent.relationships.get(relationship, []) if parent is not None else []
+            child = related[int(operation.child * len(related))] if related and operation.child is not None else MISSING_ID
+            return "DELETE", "%s/%s" % (path, child), None
+        return "GET", path, None
+
+    def step(self, operation):
+        # -> differences between the server's and the model's answer, empty when they agree
+        method, path, body = self.resolve(operation)
+        headers = {"Accept": operation.accept}
+        if body is not None:
+            headers["Content-Type"] = "application/json" if operation.body_format == "json" else "application/xml"
+        self.requests.append((method, path, headers, body))
+        encoded = body.encode("utf-8") if body is not None else None
+        response = self.session.request(method, self.base_url + path, data=encoded, headers=headers)
+        status, expected_headers, expected_body = self.model.handle(method, path, headers, encoded)
+        location = response.headers.get("Location")
+        if response.status_code == 201 and location:
+            self.created.append(tuple(location.split("/")[-2:]))
+        differences = []
+        if response.status_code != status:
+            differences.append("status %d, model %d" % (response.status_code, status))
+        for name in ("Content-Type", "Location"):
+            if response.headers.get(name) != expected_headers.get(name):
+                differences.append("%s %r, model %r" % (name, response.headers.get(name), expected_headers.get(name)))
+        content_type = response.headers.get("Content-Type", "")
+        actual = without_null_pointer_detail(response.content.decode("utf-8", "replace"))
+        expected = without_null_pointer_detail(expected_body.decode("utf-8"))
+        if not differences and not bodies_equal(content_type, actual, expected):
+            differences.append("body %s, model %s" % (actual[:200], expected[:200]))
+        return differences
+
+    def execute(self, operations):
+        for index, operation in enumerate(operations):
+            differences = self.step(operation)
+            if differences:
+                return Failure(index, operation, list(self.requests), differences)
+        return None
+
+    def clean_up(self):
+        for collection, instance_id in reversed(self.created):
+            self.session.delete(self.base_url + "/%s/%s" % (collection, instance_id), headers={"Accept": "application/json"})
+
+
+def check(session, base_url, operations):
+    # -> (Failure or None, requests sent)
+    run = Run(session, base_url)
+    run.sync()
+    try:
+        return run.execute(operations), len(run.requests)
+    finally:
+        run.clean_up()
+
+
+def signature(failure):
+    # Shrinking keeps the same kind of failure, not just any failure
+    return (failure.operation.kind, failure.operation.collection,
+            tuple(sorted(difference.split(" ")[0] for difference in failure.differences)))
+
+
+def shrink(session, base_url, operations, failure):
+    # Delta debugging: drop chunks of operations while the failure persists, halving the chunk size
+    # once a full pass drops nothing
+    wanted = signature(failure)
+    operations = operations[:failure.index + 1]
+    chunk = max(len(operations) // 2, 1)
+    while True:
+        dropped = False
+        start = 0
+        while start < len(operations):
+            candidate = operations[:start] + operations[start + chunk:]
+            result = check(session, base_url, candidate)[0] if candidate else None
+            if result is not None and signature(result) == wanted:
+                operations, failure, dropped = candidate[:result.index + 1], result, True
+            else:
+                start += chunk
+        if chunk == 1 and not dropped:
+            return operations, failure
+        if not dropped:
+            chunk = max(chunk // 2, 1)
+
+
+def describe(failure):
+    lines = ["model and server disagree on operation %d (%s %s):" % (failure.index, failure.operation.kind, failure.operation.collection)]
+    for method, path, headers, body in failure.requests:
+        lines.append("  %s %s %s%s" % (method, path, json.dumps(headers), " " + body if body is not None else ""))
+    lines.extend("  -> " + difference for difference in failure.differences)
+    return "\n".join(lines)
+
+
+def new_session():
+    session = client.new_session()
+    # Skips the proxy settings requests otherwise reads from the environment on every call
+    session.trust_env = False
+    return session
+
+
+def run_seeds(base_url, seeds, ops, results):
+    session = new_session()
+    while True:
+        try:
+            seed = seeds.get_nowait()
+        except queue.Empty:
+            return
+        operations = generate(random.Random(seed), ops)
+        failure, sent = check(session, base_url, operations)
+        if failure is not None:
+            failure = shrink(session, base_url, operations, failure)[1]
+        results.append((seed, sent, failure))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Random operation sequences checked against the in-memory model")
+    parser.add_argument("--url", help="server to test, by default --servers jars are started")
+    parser.add_argument("--servers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    servers = [] if args.url else [TodoManagerServer(free_port()).launch() for _ in range(args.servers)]
+    for server in servers:
+        server.wait_until_ready()
+    base_urls = [args.url] if args.url else [server.base_url for server in servers]
+    seeds = queue.Queue()
+    for seed in range(args.seed, args.seed + args.runs):
+        seeds.put(seed)
+    results = []
+    started = time.perf_counter()
+    workers = [threading.Thread(target=run_seeds, args=(base_url, seeds, args.ops, results)) for base_url in base_urls]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        for server in servers:
+            server.stop()
+    elapsed = time.perf_counter() - started
+    sent = sum(result[1] for result in results)
+    failures = [(seed, failure) for seed, _, failure in sorted(results, key=lambda result: result[0]) if failure is not None]
+    for seed, failure in failures:
+        print("seed %d: %s" % (seed, describe(failure)))
+    print("%d runs, %d operations, %d failed, %.0f operations/s across %d server(s)" % (
+        len(results), sent, len(failures), sent / elapsed, len(base_urls)))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
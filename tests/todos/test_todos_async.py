@@ -0,0 +1,39 @@
+import asyncio
+import os
+import random
+from tests.base import AsyncApiTestCase
+
+# Longer runs: TODO_MANAGER_ID_STRESS_REQUESTS=5000, or python -m benchmarks.contention for the ramp
+REQUEST_COUNT = int(os.environ.get("TODO_MANAGER_ID_STRESS_REQUESTS", "400"))
+
+# Every create the server validates takes the next id, whether it succeeds or not
+# (see test_post_todos_json_id_gap), so each kind of request consumes exactly one id
+REQUESTS = {
+    "todos": ({"title": "Stress todo"}, {}, {"title": "Stress todo", "fake_attribute": "x"}),
+    "projects": ({"title": "Stress project"}, {"title": "Stress project", "completed": "x"}),
+}
+
+
+class TestTodosAsync(AsyncApiTestCase):
+
+    async def next_id(self, collection):
+        response = await self.client.post("/" + collection, json=REQUESTS[collection][0])
+        self.assertEqual(response.status_code, 201)
+        return int(response.json()["id"])
+
+    async def test_post_todos_projects_concurrent_id_allocation(self):
+        rng = random.Random(0)
+        first = {collection: await self.next_id(collection) for collection in REQUESTS}
+        plan = [(collection, rng.choice(REQUESTS[collection])) for collection in rng.choices(list(REQUESTS), k=REQUEST_COUNT)]
+        responses = await asyncio.gather(*[self.client.post("/" + collection, json=body) for collection, body in plan])
+
+        for collection in REQUESTS:
+            sent = [(body, response) for (planned, body), response in zip(plan, responses) if planned == collection]
+            for body, response in sent:
+                self.assertEqual(response.status_code, 201 if body is REQUESTS[collection][0] else 400, response.content)
+            ids = [int(response.json()["id"]) for _, response in sent if response.status_code == 201]
+            # No id handed out twice, all of them taken from the range the burst consumed
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertTrue(all(first[collection] < new_id <= first[collection] + len(sent) for new_id in ids))
+            # The counter moved on by exactly one per request, none lost or reused
+            self.assertEqual(await self.next_id(collection), first[collection] + len(sent) + 1)
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+from tests import client
+
+# TODO_MANAGER_TRACE=<path> records every request the suite makes, tagged with the running test and
+# its phase, and writes them to <path> as JSON lines when the session ends. The terminal summary then
+# lists the slowest tests with their setup/call/teardown split and the slowest route templates.
+TRACE_PATH = os.environ.get("TODO_MANAGER_TRACE")
+SLOWEST = int(os.environ.get("TODO_MANAGER_TRACE_SLOWEST", "10"))
+
+PHASES = ("setup", "call", "teardown")
+
+_ID_SEGMENT = re.compile(r"-?\d+")
+
+
+def route_template(request_url):
+    # /todos/3/categories/-1?x=y -> /todos/:id/categories/:id
+    path = urlsplit(request_url).path
+    return "/".join(":id" if _ID_SEGMENT.fullmatch(segment) else segment for segment in path.split("/")) or "/"
+
+
+class Tracer:
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        # test id -> seconds spent in each phase
+        self.tests = {}
+        self.test = None
+        self.phase = None
+        self.phase_started = 0.0
+        self.lock = threading.Lock()
+
+    def start_test(self, test):
+        with self.lock:
+            self._switch(test, "setup")
+
+    def enter_phase(self, phase):
+        with self.lock:
+            if self.test is not None and phase != self.phase:
+                self._switch(self.test, phase)
+
+    def finish_test(self):
+        with self.lock:
+            self._switch(None, None)
+
+    def _switch(self, test, phase):
+        now = time.perf_counter()
+        if self.test is not None:
+            phases = self.tests.setdefault(self.test, dict.fromkeys(PHASES, 0.0))
+            phases[self.phase] += now - self.phase_started
+        self.test, self.phase, self.phase_started = test, phase, now
+
+    def record(self, record):
+        with self.lock:
+            self.records.append(dict(record, route=route_template(record["url"]), test=self.test, phase=self.phase))
+
+    def write(self):
+        with open(self.path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(record, sort_keys=True) + "\n")
+
+    def slowest_tests(self, count=SLOWEST):
+        requests_per_test = {}
+        for record in self.records:
+            requests_per_test[record["test"]] = requests_per_test.get(record["test"], 0) + 1
+        ranked = sorted(self.tests.items(), key=lambda item: sum(item[1].values()), reverse=True)[:count]
+        return [dict(phases, test=test, total=sum(phases.values()), requests=requests_per_test.get(test, 0))
+                for test, phases in ranked]
+
+    def slowest_routes(self, count=SLOWEST):
+        routes = {}
+        for record in self.records:
+            routes.setdefault(record["method"] + " " + record["route"], []).append(record)
+        summaries = []
+        for route, records in routes.items():
+            totals = sorted(record["total"] for record in records)
+            summaries.append({
+                "route": route,
+                "requests": len(records),
+                "total": sum(totals),
+                "p50": totals[(len(totals) - 1) // 2],
+                "max": totals[-1],
+                "ttfb": sum(record["ttfb"] for record in records) / len(records),
+                "bytes": sum(record["bytes"] for record in records) // len(records),
+            })
+        return sorted(summaries, key=lambda summary: summary["total"], reverse=True)[:count]
+
+
+tracer = None
+
+
+def configure(path=TRACE_PATH):
+    global tracer
+    if path and tracer is None:
+        tracer = Tracer(path)
+        client.add_request_hook(tracer.record)
+    return tracer
+
+
+def start_test(test):
+    if tracer is not None:
+        tracer.start_test(test)
+
+
+def enter_phase(phase):
+    if tracer is not None:
+        tracer.enter_phase(phase)
+
+
+def finish_test():
+    if tracer is not None:
+        tracer.finish_test()
+
+
+def close():
+    global tracer
+    finished, tracer = tracer, None
+    if finished is not None:
+        client.remove_request_hook(finished.record)
+        finished.write()
+    return finished